@@ -1,5 +1,4 @@
 import click
-from traitlets import default
 from loader import load_level_input
 
 MODULES = {
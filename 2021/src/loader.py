@@ -1,12 +1,8 @@
-from os import getcwd
-DATA_DIR = getcwd() + "/2021/data/"
+from inputs import read_lines
 
 def load_level_input(level):
     try:
-        file_name = DATA_DIR + str(level)
-        with open(file_name, 'r') as f:
-            input = f.read().split("\n")
-        input = [int(i) for i in input]
+        input = [int(i) for i in read_lines(2021, level)]
     except FileNotFoundError:
         input = []
     return input
@@ -0,0 +1,179 @@
+# Games of https://adventofcode.com/2023/day/2, shared by the solvers of both parts.
+
+from array import array
+from importlib.util import find_spec
+from inputs import input_path
+from parse_cache import parse_file
+
+# NumPy takes about 100 ms to import, more than checking the puzzle games in Python
+HAS_NUMPY = find_spec("numpy") is not None
+# the smallest number of game and bag checks done with NumPy
+NUMPY_MIN_SIZE = 200_000
+
+class Round():
+    __slots__ = ('red', 'blue', 'green')
+    def __init__(self, input="0 red, 0 blue, 0 green"):
+        self.red = 0
+        self.blue = 0
+        self.green = 0
+        for color in input.split(","):
+            tokens = color.split()
+            if len(tokens) < 2:
+                continue
+            count = int(tokens[0])
+            name = tokens[1].lower()
+            if 'red' in name:
+                self.red = count
+            elif 'blue' in name:
+                self.blue = count
+            elif 'green' in name:
+                self.green = count
+
+    @classmethod
+    def from_rgb(cls, red, green, blue):
+        res = cls()
+        res.red, res.green, res.blue = red, green, blue
+        return res
+
+    def power(self):
+        return self.red * self.green * self.blue
+
+    def as_rgb(self):
+        return [self.red, self.green, self.blue]
+    
+    def __str__(self):
+        return f"{self.red} {self.green} {self.blue} "
+
+class GameStore():
+    """
+    Columnar store of the games of a session, parsed once.
+    The cubes of every round are stored in one int array per color, the rounds of the game i
+    are rounds offsets[i] to offsets[i+1], and the largest number of cubes of each color
+    shown in a game is kept per game: a game is valid for a bag when these maximums fit in it.
+    """
+    __slots__ = ('ids', 'offsets', 'red', 'green', 'blue', 'max_red', 'max_green', 'max_blue')
+
+    def __init__(self, ids, offsets, red, green, blue):
+        self.ids = array('q', ids)
+        self.offsets = array('q', offsets)
+        self.red = array('q', red)
+        self.green = array('q', green)
+        self.blue = array('q', blue)
+        self.max_red, self.max_green, self.max_blue = [
+            array('q', [max(color[start:end], default=0) for start, end in zip(offsets, offsets[1:])])
+            for color in (red, green, blue)]
+
+    @classmethod
+    def from_columns(cls, columns):
+        res = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(res, name, columns[name])
+        return res
+
+    def columns_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def columns(self):
+        """
+        The per game maximums as NumPy arrays sharing the memory of the store.
+        """
+        # imported here, the solvers that run without it do not pay for importing it
+        import numpy as np
+
+        return [np.frombuffer(column, dtype=np.int64) for column in (self.ids, self.max_red, self.max_green, self.max_blue)]
+
+    def vectorized(self, checks):
+        return HAS_NUMPY and checks >= NUMPY_MIN_SIZE
+
+    def valid_ids(self, max_round):
+        if self.vectorized(len(self)):
+            ids, red, green, blue = self.columns()
+            return ids[(red <= max_round.red) & (green <= max_round.green) & (blue <= max_round.blue)].tolist()
+        return [game_id for game_id, red, green, blue in zip(self.ids, self.max_red, self.max_green, self.max_blue)
+                if red <= max_round.red and green <= max_round.green and blue <= max_round.blue]
+
+    def valid_id_sums(self, max_rounds):
+        """
+        Sum of the ids of the valid games for each bag of max_rounds, all the bags at once.
+        """
+        if self.vectorized(len(self) * len(max_rounds)):
+            import numpy as np
+
+            ids, red, green, blue = self.columns()
+            limits = np.array([[round.red, round.green, round.blue] for round in max_rounds], dtype=np.int64).reshape(-1, 3)
+            res = []
+            # a block of bags by games matrix at a time, about 4 million cells
+            block = max(1, 2**22 // max(1, len(ids)))
+            for i in range(0, len(limits), block):
+                bags = limits[i:i+block]
+                valid = (red <= bags[:, 0:1]) & (green <= bags[:, 1:2]) & (blue <= bags[:, 2:3])
+                res += (valid @ ids).tolist()
+            return res
+        return [sum(self.valid_ids(max_round)) for max_round in max_rounds]
+
+    def game_str(self, i):
+        rounds = "".join(Round.from_rgb(self.red[j], self.green[j], self.blue[j]).__str__() + ";"
+                         for j in range(self.offsets[i], self.offsets[i+1]))
+        return f"{self.ids[i]}:{rounds}"
+
+# version of the packed game store kept on disk, to change with the parser or the store
+PARSER_VERSION = 1
+
+def parse_games(input):
+    ids, offsets, red, green, blue = [], [0], [], [], []
+    for line in input.split("\n"):
+        header, _, rounds = line.partition(":")
+        try:
+            game_id = int(header.split(" ")[1])
+        except (IndexError, ValueError):
+            # not a game, it would never be valid
+            continue
+        for round in rounds.split(";"):
+            cubes = Round(round)
+            red.append(cubes.red)
+            green.append(cubes.green)
+            blue.append(cubes.blue)
+        ids.append(game_id)
+        offsets.append(len(red))
+    return GameStore(ids, offsets, red, green, blue)
+
+class GameSession():
+    __slots__ = ('store',)
+    def __init__(self, file_name):
+        self.load_data(file_name)
+
+    def valid_games(self, max_round=Round("0 red, 0 blue, 0 green")):
+        return self.store.valid_ids(max_round)
+
+    def valid_id_sums(self, max_rounds):
+        return self.store.valid_id_sums(max_rounds)
+
+    def __str__(self):
+        return "".join([self.store.game_str(i) + "\n" for i in range(len(self.store))])
+
+    def minimums(self):
+        store = self.store
+        return [Round.from_rgb(red, green, blue) for red, green, blue in zip(store.max_red, store.max_green, store.max_blue)]
+
+    def powers(self):
+        """
+        Power of the minimum set of cubes of every game.
+        """
+        if self.store.vectorized(len(self.store)):
+            _, red, green, blue = self.store.columns()
+            return (red * green * blue).tolist()
+        return [cube_set.power() for cube_set in self.minimums()]
+
+    def load_data(self, file_name):
+        # the store is shared with the sessions of the same input, it is never modified
+        self.store = parse_file(file_name, parse_games,
+                                packed=("2023-02", PARSER_VERSION, GameStore.columns_dict, GameStore.from_columns))
+
+def load_data(file_name):
+    """
+    The game session of an input.
+    """
+    return GameSession(input_path(2023, file_name=file_name))
@@ -1,5 +1,7 @@
 # https://adventofcode.com/2023/day/1
 
+from inputs import read_lines
+
 def calc_calibration(input, debug=False):
     tmp = []
     input = input.lower()
@@ -14,15 +16,23 @@ def calc_calibration(input, debug=False):
     if debug: print(input, " ", res)
     return int(res)
 
-# Pass test cases
-test_data = ['1abc2', 'pqr3stu8vwx', 'a1b2c3d4e5f', 'treb7uchet']
-test_res = [12, 38, 15, 77]
-print("Testing test data")
-assert sum(test_res) == sum([calc_calibration(i, debug=True) for i in test_data]) == 142
+def load_data(file_name):
+    """
+    The lines of the calibration document.
+    """
+    return [line.decode() for line in read_lines(2023, file_name=file_name)]
+
+def solve(part, data):
+    if part != 1:
+        raise ValueError(f"This solver only solves part 1, not part {part}")
+    return sum([calc_calibration(line) for line in data])
 
+if __name__ == "__main__":
+    # Pass test cases
+    test_data = ['1abc2', 'pqr3stu8vwx', 'a1b2c3d4e5f', 'treb7uchet']
+    test_res = [12, 38, 15, 77]
+    print("Testing test data")
+    assert sum(test_res) == sum([calc_calibration(i, debug=True) for i in test_data]) == 142
 
-file_name = 'data/01.txt'
-with open(file_name, 'r') as f:
-    input = f.read().split("\n")
+    print(solve(1, load_data('01.txt')))
 
-print(sum([calc_calibration(i) for i in input]))
@@ -1,66 +1,137 @@
 # https://adventofcode.com/2023/day/1#part2
 
-NUMBERS = {'one':'o1e', 'two':'t2o', 'three':'t3e', 'four':'f4r', 'five':'f5e', 'six':'s6x', 'seven':'s7n', 'eight':'e8t', 'nine':'n9e'}
-
-def words_to_numbers(input, debug=False):
-    pos = [(input.find(key), key) for key in NUMBERS.keys() if key in input]
-    sorted_pos = sorted(pos, key=lambda x: x[0])
-    cur_pos = 0
-    res = ""
-    for found_str in sorted_pos:
-        if cur_pos < found_str[0]:
-            res = res + input[cur_pos:found_str[0]]
-            cur_pos = found_str[0]
-        if cur_pos == found_str[0]:
-            res = res + NUMBERS[found_str[1]]
-            last_word_pos = found_str[0] + len(found_str[1]) - 1
-        if cur_pos > found_str[0]:
-            if last_word_pos == found_str[0]:
-                res = res + NUMBERS[found_str[1]]
-                last_word_pos = found_str[0] + len(found_str[1]) - 1
-            else:
-                pass
-        cur_pos = found_str[0] + len(found_str[1])
-    if cur_pos < len(input):
-        res = res + input[cur_pos:]
-    return res
+from inputs import input_path, open_input
+
+DIGIT_WORDS = ['one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine']
+NEWLINE = ord('\n')
+
+class DigitScanner():
+    """
+    Find the first and the last digit of a line, written with a digit or spelled out.
+    The digits and the words are matched by an Aho-Corasick automaton reading the line forwards,
+    and the reversed words by a second automaton reading it backwards, so only the start and the end
+    of the line are read, and overlapping words like 'eightwo' are both found.
+    """
+    __slots__ = ('forward', 'backward')
+
+    def __init__(self, words=DIGIT_WORDS):
+        patterns = {str(value).encode(): value for value in range(1, 10)}
+        patterns.update({word.lower().encode(): value for value, word in enumerate(words, 1)})
+        for pattern in patterns:
+            for other in patterns:
+                if pattern != other and pattern in other:
+                    # the first match ending in a line would not always be the first one starting
+                    raise ValueError(f"'{pattern.decode()}' is part of '{other.decode()}'")
+        self.forward = self.build(patterns)
+        self.backward = self.build({pattern[::-1]: value for pattern, value in patterns.items()})
+
+    @staticmethod
+    def build(patterns):
+        """
+        Automaton of the patterns, as (transitions, values).
+        transitions[state] maps the next byte to the next state, any byte not in the map goes back to the root.
+        values[state] is the value of the pattern ending in this state, or None.
+        """
+        transitions = [{}]
+        values = [None]
+        for pattern, value in patterns.items():
+            state = 0
+            for ch in pattern:
+                if ch not in transitions[state]:
+                    transitions.append({})
+                    values.append(None)
+                    transitions[state][ch] = len(transitions) - 1
+                state = transitions[state][ch]
+            values[state] = value
+
+        # breadth first, the fallback of a state is always complete before the state itself
+        alphabet = {ch for pattern in patterns for ch in pattern}
+        fallback = [0] * len(transitions)
+        queue = list(transitions[0].values())
+        for state in queue:
+            children = dict(transitions[state])
+            for ch in alphabet:
+                if ch in children:
+                    child = children[ch]
+                    fallback[child] = transitions[fallback[state]].get(ch, 0) if state else 0
+                    queue.append(child)
+                elif state:
+                    transitions[state][ch] = transitions[fallback[state]].get(ch, 0)
+            if values[state] is None:
+                values[state] = values[fallback[state]]
+        # the case of the letters is ignored here, so every caller reads the lines as they are
+        for state in transitions:
+            state.update({ch - ord('a') + ord('A'): child for ch, child in state.items() if ord('a') <= ch <= ord('z')})
+        return transitions, values
+
+    @staticmethod
+    def scan(automaton, data, indexes):
+        transitions, values = automaton
+        state = 0
+        for i in indexes:
+            state = transitions[state].get(data[i], 0)
+            if values[state] is not None:
+                return values[state]
+        return None
+
+    def first_last(self, data, start=0, end=None):
+        """
+        First and last digits of data[start:end], or None without digit.
+        """
+        end = len(data) if end is None else end
+        first = self.scan(self.forward, data, range(start, end))
+        if first is None:
+            return None
+        return first, self.scan(self.backward, data, range(end - 1, start - 1, -1))
 
-def words_to_numbers2(input, debug=False):
-    for key in NUMBERS.keys():
-        if key in input:
-            input = input.replace(key, NUMBERS[key])
-    return input
+    def calibration(self, line):
+        if isinstance(line, str):
+            line = line.encode()
+        digits = self.first_last(line)
+        return 0 if digits is None else 10 * digits[0] + digits[1]
+
+    def total(self, file_name):
+        """
+        Sum of the calibration values of a whole file, read through a memory map without copying the lines.
+        """
+        res = 0
+        with open_input(2023, file_name=file_name) as data:
+            for line in data.views():
+                digits = self.first_last(line)
+                if digits is not None:
+                    res += 10 * digits[0] + digits[1]
+        return res
+
+SCANNER = DigitScanner()
 
 def calc_calibration(input, debug=False):
-    tmp = []
-    org_input = input.lower()
-    input = wtn = words_to_numbers(input, debug)
-    for ch in input:
-        # ord('0') = 48, ord('9') = 57
-        if ord(ch) >= 48 and ord(ch) <= 57:
-            tmp.append(ch)
-    try:
-        res = "".join([tmp[0], tmp[-1]])
-    except IndexError:
-        return 0
-    if debug: print(org_input, " ", wtn, " ", res)
-    return int(res)
-
-# Pass test cases
-test_data = ['two1nine','eightwothree','abcone2threexyz','xtwone3four','4nineeightseven2','zoneight234','7pqrstsixteen','ninef', '6abc', 'two']
-test_res = [29, 83, 13, 24, 42, 14, 76, 99, 66, 22]
-print('Testing test data')
-assert sum(test_res) == sum([calc_calibration(i, debug=True) for i in test_data]) 
-
-# wtn_2_test_data = ['two1nine','eightwothree','abcone2threexyz','xtwone3four','4nineeightseven2','zoneight234','7pqrstsixteen','ninef', '6abc', 'two', 'one7sixninesix']
-# for i in wtn_2_test_data:
-#     print(i, " ", words_to_numbers(i))
-
-
-print('Calculating calibration')
-file_name = '2023/data/01.txt'
-# file_name = '2023/data/01_test_cases.txt'
-with open(file_name, 'r') as f:
-    input = f.read().split("\n")
-
-print(sum([calc_calibration(i, debug=True) for i in input]))
+    res = SCANNER.calibration(input)
+    if debug: print(input.lower(), " ", res)
+    return res
+
+def load_data(file_name):
+    """
+    The path of the calibration document, the scanner reads it through a memory map.
+    """
+    return input_path(2023, file_name=file_name)
+
+def solve(part, data):
+    if part != 2:
+        raise ValueError(f"This solver only solves part 2, not part {part}")
+    return SCANNER.total(data)
+
+if __name__ == "__main__":
+    # Pass test cases
+    test_data = ['two1nine','eightwothree','abcone2threexyz','xtwone3four','4nineeightseven2','zoneight234','7pqrstsixteen','ninef', '6abc', 'two', 'eightwo', 'one7oneight', '']
+    test_res = [29, 83, 13, 24, 42, 14, 76, 99, 66, 22, 82, 18, 0]
+    print('Testing test data')
+    assert test_res == [calc_calibration(i, debug=True) for i in test_data]
+    # total scans the lines with first_last, both ignore the case
+    mixed_case = ['TwO1NiNe', 'EIGHTwo', 'xTWOne3Four', 'SEVEN']
+    assert [calc_calibration(i) for i in mixed_case] == [29, 82, 24, 77]
+    assert [SCANNER.first_last(i.encode()) for i in mixed_case] == [(2, 9), (8, 2), (2, 4), (7, 7)]
+
+    print('Calculating calibration')
+    # print(solve(2, load_data('01_test_cases.txt')))
+    print(solve(2, load_data('01.txt')))
+
@@ -1,15 +1,25 @@
 #https://adventofcode.com/2023/day/3
 
+from inputs import input_path
+from parse_cache import parse_file
+
 SYMBOLS=set(['*','#','$','+','/','-', '%', '&', '@', '='])
 DIGITS=set(['0','1','2','3','4','5','6','7','8','9'])
 DOT=set(['.'])
+ALLOWED=DIGITS.union(SYMBOLS).union(DOT)
 GEAR='*'
         
+def parse_schematic(input):
+    """
+    The lines of the schematic, surrounded by dots.
+    """
+    m = ['.'+line+'.' for line in input.split("\n") if line != ""]
+    m.append('.'*len(m[0]))
+    m.insert(0, '.'*len(m[0]))
+    return tuple(m)
+
 class Schematic():
-    m = []
-    numbers = []
-    valid_numbers = []
-    gears = {}
+    __slots__ = ('m', 'numbers', 'labels', 'symbols', 'valid_numbers', 'gears')
     def __init__(self, file_name) -> None:
         self.load_data(file_name)
         is_valid_schematic, bad_elements = self.valid_schematic()
@@ -20,11 +30,7 @@ class Schematic():
         self.find_gears()
 
     def load_data(self, file_name):
-        with open(file_name, 'r') as f:
-            input = f.read().split("\n")
-        self.m = ['.'+line+'.' for line in input if line != ""]
-        self.m.append('.'*len(self.m[0]))
-        self.m.insert(0, '.'*len(self.m[0]))
+        self.m = parse_file(file_name, parse_schematic)
 
     def __str__(self):
         return "\n".join([line for line in self.m])
@@ -34,67 +40,81 @@ class Schematic():
         bad_elements = []
         for line in self.m:
             for element in line:
-                if element not in DIGITS.union(SYMBOLS).union(DOT):
+                if element not in ALLOWED:
                     bad_elements.append(element)
                     res = False
         return res, set(bad_elements)
     
     def find_numbers(self):
+        """
+        Find the numbers and label every cell of the schematic with the index of the number
+        written on it, or -1, so the numbers next to a cell are found by looking at its neighbors.
+        """
         numbers = []
+        labels = []
         x = 0
         for line in self.m:
+            row = [-1] * len(line)
             j = 0
             while j < len(line):
                 if line[j] in DIGITS:
-                    a_j = line[j]
                     y1 = y2 = j
-                    while line[y2] in DIGITS and y2 < len(line):
+                    while y2 < len(line) and line[y2] in DIGITS:
                         y2 += 1
                     sub = line[y1:y2]
+                    row[y1:y2] = [len(numbers)] * len(sub)
                     numbers.append([(x,y1,y1+len(sub)), sub])
-                    j = y2-1
-                j += 1
+                    j = y2
+                else:
+                    j += 1
+            labels.append(row)
             x += 1
         self.numbers = numbers
+        self.labels = labels
+        self.find_symbols()
+
+    def find_symbols(self):
+        """
+        Map every symbol of the schematic to the indexes of the numbers next to it.
+        The schematic is padded with dots, so the symbols are never on the border.
+        """
+        self.symbols = {}
+        for x, line in enumerate(self.m):
+            for y, element in enumerate(line):
+                if element in SYMBOLS:
+                    neighbors = {self.labels[r][c] for r in (x-1, x, x+1) for c in (y-1, y, y+1)}
+                    neighbors.discard(-1)
+                    self.symbols[(x,y)] = sorted(neighbors)
 
     def calculate_valid_numbers(self):
-        for number in self.numbers:
-            r = number[0][0]
-            c1 = number[0][1]
-            c2 = number[0][2]
-            l1 = self.m[r-1][c1-1:c2+1]
-            l2 = self.m[r][c1-1] +self.m[r][c2]
-            l3 = self.m[r+1][c1-1:c2+1]
-            found = [True for symbol in SYMBOLS if symbol in l1 or symbol in l2 or symbol in l3]
-            if any(found):
-                self.valid_numbers.append(int(number[1]))
+        valid = set()
+        for neighbors in self.symbols.values():
+            valid.update(neighbors)
+        self.valid_numbers = [int(self.numbers[i][1]) for i in sorted(valid)]
 
     def find_gears(self):
-        possible_gears = []
-        x = 0
-        for line in self.m:
-            possible_gears.append([(x,y) for y in range(len(line)) if line.find(GEAR, y) == y])
-            x += 1
-        possible_gears = [item for sublist in possible_gears for item in sublist if sublist]
+        self.gears = {}
+        for symbol, neighbors in self.symbols.items():
+            if self.m[symbol[0]][symbol[1]] == GEAR and neighbors:
+                self.gears[symbol] = [self.numbers[i][1] for i in neighbors]
 
-        for gear in possible_gears:
-            for number in self.numbers:
-                if ((gear[0] >= number[0][0]-1) and (gear[0] <= number[0][0]+1)) \
-                    and ((gear[1] >= number[0][1]-1) and (gear[1] <= number[0][2])):
-                        if gear in self.gears:
-                            self.gears[gear].append(number[1])
-                        else:
-                            self.gears[gear] = [number[1]]     
-        
     def gear_ratio(self):
         return sum([int(self.gears[gear][0])*int(self.gears[gear][1]) for gear in self.gears.keys() if len(self.gears[gear]) == 2])
             
-# file_name = '2023/data/03_test_cases.txt'
-# test_sch = Schematic(file_name=file_name)
-# print(test_sch)
-# print(test_sch.gear_ratio())
+def load_data(file_name):
+    """
+    The schematic of an input.
+    """
+    return Schematic(file_name=input_path(2023, file_name=file_name))
+
+def solve(part, data):
+    if part != 2:
+        raise ValueError(f"This solver only solves part 2, not part {part}")
+    return data.gear_ratio()
 
+if __name__ == "__main__":
+    # test_sch = load_data('03_test_cases.txt')
+    # print(test_sch)
+    # print(solve(2, test_sch))
 
-file_name = '2023/data/03_input.txt'
-test_sch = Schematic(file_name=file_name)
-print(test_sch.gear_ratio())
+    print(solve(2, load_data('03_input.txt')))
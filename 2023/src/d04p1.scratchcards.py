@@ -1,9 +1,11 @@
 # https://adventofcode.com/2023/day/4
 
+from array import array
+from inputs import input_path
+from parse_cache import parse_file
+
 class Card():
-    id = None
-    numbers = []
-    winning_numbers = []
+    __slots__ = ('id', 'numbers', 'winning_numbers')
 
     def __init__(self, line) -> None:
         self.id = line.split(":")[0].split(" ")[1].strip()
@@ -11,6 +13,14 @@ class Card():
         self.numbers = [int(number.strip()) for number in line.split(":")[1].split('|')[1].strip().split(" ") if number != ""]
         pass
 
+    @classmethod
+    def from_values(cls, id, winning_numbers, numbers):
+        card = cls.__new__(cls)
+        card.id = id
+        card.winning_numbers = winning_numbers
+        card.numbers = numbers
+        return card
+
     def value(self):
         res = 0
         winners = [1 for number in self.numbers if number in self.winning_numbers]
@@ -25,16 +35,48 @@ class Card():
         return f"Card {self.id}: {winning_numbers}|{numbers}"
 
 
+# version of the packed cards kept on disk, to change with the parser or the packing
+PARSER_VERSION = 1
+
+def parse_cards(input):
+    return tuple(Card(card) for card in input.split("\n") if card != "")
+
+
+def pack_cards(cards):
+    """
+    The cards as flat arrays of numbers, with the offset of each card in the arrays.
+    The ids are kept as text, they are not always numbers.
+    """
+    fields = {"ids": " ".join(card.id for card in cards).encode(),
+              "winning_offsets": array('q', [0]), "winning_numbers": array('q'),
+              "offsets": array('q', [0]), "numbers": array('q')}
+    for card in cards:
+        fields["winning_numbers"].extend(card.winning_numbers)
+        fields["winning_offsets"].append(len(fields["winning_numbers"]))
+        fields["numbers"].extend(card.numbers)
+        fields["offsets"].append(len(fields["numbers"]))
+    return fields
+
+
+def unpack_cards(fields):
+    winning_offsets, winning_numbers = fields["winning_offsets"], fields["winning_numbers"]
+    offsets, numbers = fields["offsets"], fields["numbers"]
+    ids = fields["ids"].decode().split(" ") if fields["ids"] else []
+    return tuple(Card.from_values(id, winning_numbers[winning_offsets[i]:winning_offsets[i+1]].tolist(),
+                                  numbers[offsets[i]:offsets[i+1]].tolist())
+                 for i, id in enumerate(ids))
+
+
 class ScratchcardsPile():
-    cards = []
+    __slots__ = ('cards',)
 
     def __init__(self, file_name) -> None:
         self.load_data(file_name)
 
     def load_data(self, file_name):
-        with open(file_name, 'r') as f:
-            input = f.read().split("\n")
-        self.cards = [Card(card) for card in input if card != ""]
+        # the cards are shared with the piles of the same input, they are never modified
+        self.cards = parse_file(file_name, parse_cards,
+                                packed=("2023-04-1", PARSER_VERSION, pack_cards, unpack_cards))
 
     def total_worth(self):
         values = [card.value() for card in self.cards]
@@ -44,11 +86,20 @@ class ScratchcardsPile():
     def __str__(self):
         return "\n".join([card.__str__() for card in self.cards])
 
-file_name = "2023/data/04_test_cases.txt"
-test_pile = ScratchcardsPile(file_name)
-print(test_pile)
-assert test_pile.total_worth() == 13
+def load_data(file_name):
+    """
+    The pile of scratchcards of an input.
+    """
+    return ScratchcardsPile(input_path(2023, file_name=file_name))
+
+def solve(part, data):
+    if part != 1:
+        raise ValueError(f"This solver only solves part 1, not part {part}")
+    return data.total_worth()
+
+if __name__ == "__main__":
+    test_pile = load_data('04_test_cases.txt')
+    print(test_pile)
+    assert solve(1, test_pile) == 13
 
-file_name = "2023/data/04_input.txt"
-pile = ScratchcardsPile(file_name)
-print(pile.total_worth())
+    print(solve(1, load_data('04_input.txt')))
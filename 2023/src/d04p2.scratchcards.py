@@ -1,45 +1,95 @@
 # https://adventofcode.com/2023/day/4
 
 import re
+from array import array
+from inputs import input_path
+from parse_cache import parse_file
 
 class Card():
-    id = None
-    numbers = []
-    winning_numbers = []
-    copies = None
+    __slots__ = ('id', 'numbers', 'winning_numbers', 'matches')
 
-    def __init__(self, line, copies = 1) -> None:
+    def __init__(self, line) -> None:
         self.id = int(re.sub(' +', ' ', line.split(":")[0]).strip().split()[1])
         self.winning_numbers = [int(number.strip()) for number in line.split(":")[1].split('|')[0].strip().split(" ") if number != ""]
         self.numbers = [int(number.strip()) for number in line.split(":")[1].split('|')[1].strip().split(" ") if number != ""]
-        self.copies = copies
-        
+        # the matches are counted once, the card never changes
+        self.matches = len(set(self.numbers).intersection(self.winning_numbers))
+
+    @classmethod
+    def from_values(cls, id, winning_numbers, numbers, matches):
+        card = cls.__new__(cls)
+        card.id = id
+        card.winning_numbers = winning_numbers
+        card.numbers = numbers
+        card.matches = matches
+        return card
+
     def value(self):
-        return len([1 for number in self.numbers if number in self.winning_numbers])
+        return self.matches
 
     def __str__(self):
         winning_numbers = " ".join([str(number) for number in self.winning_numbers])
         numbers = " ".join([str(number) for number in self.numbers])
         return f"Card {self.id}: {winning_numbers}|{numbers}"
 
+# version of the packed cards kept on disk, to change with the parser or the packing
+PARSER_VERSION = 1
+
+def parse_cards(input):
+    return tuple(Card(card) for card in input.split("\n") if card != "")
+
+def pack_cards(cards):
+    """
+    The cards as flat arrays of numbers, with the offset of each card in the arrays.
+    """
+    fields = {"ids": array('q', [card.id for card in cards]), "matches": array('q', [card.matches for card in cards]),
+              "winning_offsets": array('q', [0]), "winning_numbers": array('q'),
+              "offsets": array('q', [0]), "numbers": array('q')}
+    for card in cards:
+        fields["winning_numbers"].extend(card.winning_numbers)
+        fields["winning_offsets"].append(len(fields["winning_numbers"]))
+        fields["numbers"].extend(card.numbers)
+        fields["offsets"].append(len(fields["numbers"]))
+    return fields
+
+def unpack_cards(fields):
+    winning_offsets, winning_numbers = fields["winning_offsets"], fields["winning_numbers"]
+    offsets, numbers = fields["offsets"], fields["numbers"]
+    return tuple(Card.from_values(id, winning_numbers[winning_offsets[i]:winning_offsets[i+1]].tolist(),
+                                  numbers[offsets[i]:offsets[i+1]].tolist(), fields["matches"][i])
+                 for i, id in enumerate(fields["ids"]))
+
 class ScratchcardsPile():
-    cards = []
+    # the cards are shared with the piles of the same input, the copies belong to the pile
+    __slots__ = ('cards', 'copies')
 
     def __init__(self, file_name) -> None:
         self.load_data(file_name)
 
     def load_data(self, file_name):
-        with open(file_name, 'r') as f:
-            input = f.read().split("\n")
-        self.cards = [Card(card) for card in input if card != ""]
-        for pos in range(len(self.cards)):
-            _cur_card_copies = self.cards[pos].copies #qa
-            for reps in range(self.cards[pos].copies):
-                _cur_card_value = self.cards[pos].value() # qa
-                _affected_ids = [ c.id for c in self.cards[pos+1:pos+1+self.cards[pos].value()] ] #qa
-                if self.cards[pos].value() > 0:
-                    for card in self.cards[pos+1:pos+1+self.cards[pos].value()]:
-                        card.copies += 1
+        self.cards = parse_file(file_name, parse_cards,
+                                packed=("2023-04-2", PARSER_VERSION, pack_cards, unpack_cards))
+        self.copies = self.propagate_copies(self.cards)
+
+    @staticmethod
+    def propagate_copies(cards):
+        """
+        Number of copies of each card.
+        All the copies of a card win the same next cards, so they are added at once: the copies
+        won by the card are added to a range of the next cards of a difference array, and
+        the running sum of the difference array gives the copies won by each card.
+        """
+        copies = [1] * len(cards)
+        # won[pos] - won[pos - 1] copies are won by the card pos
+        won = [0] * (len(cards) + 1)
+        running = 0
+        for pos, card in enumerate(cards):
+            running += won[pos]
+            copies[pos] += running
+            if card.matches > 0:
+                won[pos+1] += copies[pos]
+                won[min(pos+1+card.matches, len(cards))] -= copies[pos]
+        return copies
 
     def total_worth(self):
         values = [card.value() for card in self.cards]
@@ -47,16 +97,25 @@ class ScratchcardsPile():
         return sum(values)
     
     def total_cards(self):
-        return sum([card.copies for card in self.cards])
+        return sum(self.copies)
     
     def __str__(self):
-        return "\n".join([f"{str(card.copies)} - {card.__str__()}" for card in self.cards])
+        return "\n".join([f"{str(copies)} - {card.__str__()}" for card, copies in zip(self.cards, self.copies)])
+
+def load_data(file_name):
+    """
+    The pile of scratchcards of an input.
+    """
+    return ScratchcardsPile(input_path(2023, file_name=file_name))
+
+def solve(part, data):
+    if part != 2:
+        raise ValueError(f"This solver only solves part 2, not part {part}")
+    return data.total_cards()
 
-file_name = "2023/data/04_test_cases.txt"
-test_pile = ScratchcardsPile(file_name)
-print(test_pile)
-assert test_pile.total_cards() == 30
+if __name__ == "__main__":
+    test_pile = load_data('04_test_cases.txt')
+    print(test_pile)
+    assert solve(2, test_pile) == 30
 
-file_name = "2023/data/04_input.txt"
-pile = ScratchcardsPile(file_name)
-print(pile.total_cards())
+    print(solve(2, load_data('04_input.txt')))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import hashlib
+import unittest
+from collections import OrderedDict
+from inputs import Input, load_parsed
+
+# Cache of the parsed puzzle inputs, shared by the 2023 solvers.
+# An input is parsed once per process, whatever the file name it is read from: the parsed data is
+# keyed by the hash of the file content and by the parser. The parsers must return data that the
+# solvers never modify, since every caller of the same input gets the same objects.
+# A parser that can pack its data in arrays also keeps it on disk for the next processes.
+
+MAX_ENTRIES = 32
+
+_cache = OrderedDict()
+
+
+def content_key(content, parser):
+    # the parser function itself is part of the key: a script executed again defines new
+    # classes, and must not get objects of the classes of its previous execution
+    return (hashlib.sha256(content).hexdigest(), parser)
+
+
+def parse_file(file_name, parser, packed=None):
+    """
+    Return parser(text of the file), parsed only if this content was not parsed yet by this parser.
+    The least recently used inputs are dropped past MAX_ENTRIES.
+    With packed=(name, version, pack, unpack), the parsed data is also read from and written to
+    the disk cache of the parsed inputs, see load_parsed.
+    """
+    with Input(file_name) as content:
+        key = content_key(content.data, parser)
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+        if packed is None:
+            res = parser(content.text())
+    if packed is not None:
+        res = load_parsed(file_name, lambda content: parser(content.text()), *packed)
+    _cache[key] = res
+    while len(_cache) > MAX_ENTRIES:
+        _cache.popitem(last=False)
+    return res
+
+
+def clear():
+    _cache.clear()
+
+
+### Unit tests ###
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up test files for unit tests.
+        """
+        import tempfile
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.calls = 0
+        clear()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, name, text):
+        file_name = self.tmp_dir.name + "/" + name
+        with open(file_name, 'w') as f:
+            f.write(text)
+        return file_name
+
+    def parser(self, text):
+        self.calls += 1
+        return tuple(text.split())
+
+    def test_same_content(self):
+        first = parse_file(self.write("a.txt", "1 2 3"), self.parser)
+        second = parse_file(self.write("b.txt", "1 2 3"), self.parser)
+        self.assertIs(first, second)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(parse_file(self.write("a.txt", "4 5"), self.parser), ("4", "5"))
+        self.assertEqual(self.calls, 2)
+
+    def test_eviction(self):
+        for i in range(MAX_ENTRIES + 1):
+            parse_file(self.write("a.txt", str(i)), self.parser)
+        self.assertEqual(len(_cache), MAX_ENTRIES)
+        parse_file(self.write("a.txt", "0"), self.parser)
+        self.assertEqual(self.calls, MAX_ENTRIES + 2)
+
+    def test_packed(self):
+        from array import array
+        directory = self.tmp_dir.name + "/parsed"
+        pack = lambda values: {"values": array('q', [int(value) for value in values])}
+        unpack = lambda fields: tuple(str(value) for value in fields["values"])
+        file_name = self.write("a.txt", "1 2 3")
+        packed = ("test", 1, pack, unpack)
+        import inputs
+        saved = inputs.PARSED_DIR
+        inputs.PARSED_DIR = directory
+        try:
+            self.assertEqual(parse_file(file_name, self.parser, packed), ("1", "2", "3"))
+            # a new process only has the disk cache
+            clear()
+            self.assertEqual(parse_file(file_name, self.parser, packed), ("1", "2", "3"))
+        finally:
+            inputs.PARSED_DIR = saved
+        self.assertEqual(self.calls, 1)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "test":
+        # Run tests
+        unittest.main(argv=[sys.argv[0]])
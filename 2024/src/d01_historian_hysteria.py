@@ -2,34 +2,62 @@
 # -*- coding: utf-8 -*-
 
 import unittest
+from inputs import read_lines
+from array import array
+from collections import Counter
+from importlib.util import find_spec
+
+# NumPy takes about 100 ms to import, more than sorting the puzzle input in Python
+HAS_NUMPY = find_spec("numpy") is not None
+# the smallest lists sorted with NumPy
+NUMPY_MIN_SIZE = 200_000
 
 # https://adventofcode.com/2024/day/1
 
 
 def total_distance(left_list, right_list):
-    res = 0
-    # unique values
-    left_sorted = sorted(left_list)
-    right_sorted = sorted(right_list)
+    if HAS_NUMPY and len(left_list) >= NUMPY_MIN_SIZE:
+        return total_distance_numpy(left_list, right_list)
+
+    # total distance, zip stops at the min length
+    return sum(abs(left - right) for left, right in zip(sorted(left_list), sorted(right_list)))
+
+def total_distance_numpy(left_list, right_list):
+    # imported here, the solvers that run without it do not pay for importing it
+    import numpy as np
+
+    # sort and subtract the whole lists at once
+    left_sorted = np.sort(np.asarray(left_list, dtype=np.int64))
+    right_sorted = np.sort(np.asarray(right_list, dtype=np.int64))
 
     # min length
     min_len = min(len(left_sorted), len(right_sorted))
 
-    # total distance
-    for i in range(min_len):
-        res += abs(left_sorted[i] - right_sorted[i])
-
-    return res
+    return int(np.abs(left_sorted[:min_len] - right_sorted[:min_len]).sum())
 
 def similarity_score(left_list, right_list):
-    res = 0
-    for left_element in left_list:
-        count = 0
-        for right_element in right_list:
-            if left_element == right_element:
-                count += 1
-        res += left_element * count
-    return res
+    # count the right list once instead of scanning it for every left element
+    counts = Counter(right_list)
+    return sum(left_element * counts[left_element] for left_element in left_list)
+
+def load_data(input_file):
+    # read the file line by line straight into arrays of 64 bits integers
+    left_list = array('q')
+    right_list = array('q')
+    for line in read_lines(2024, file_name=input_file):
+        data = line.split()
+        if data:
+            left_list.append(int(data[0]))
+            right_list.append(int(data[1]))
+    return left_list, right_list
+
+def solve(part, data):
+    left_list, right_list = data
+    if part == 1:
+        return total_distance(left_list, right_list)
+    if part == 2:
+        return similarity_score(left_list, right_list)
+    raise ValueError(f"Day 1 has no part {part}, only parts 1 and 2")
 
 class TestAdventOfCodeDay1(unittest.TestCase):
     def setUp(self):
@@ -45,6 +73,14 @@ class TestAdventOfCodeDay1(unittest.TestCase):
         """
         self.assertEqual(total_distance(self.left_list, self.right_list), 11)
 
+    @unittest.skipIf(not HAS_NUMPY, "NumPy is not installed")
+    def test_total_distance_numpy(self):
+        """
+        Test total_distance_numpy function.
+        """
+        self.assertEqual(total_distance_numpy(self.left_list, self.right_list), 11)
+        self.assertEqual(total_distance_numpy(self.left_list, self.right_list[:4]), total_distance(self.left_list, self.right_list[:4]))
+
     def test_similarity_score(self):
         """
         Test similarity_score function.
@@ -53,18 +89,21 @@ class TestAdventOfCodeDay1(unittest.TestCase):
         right_list = [4, 3, 5, 3, 9, 3]
         self.assertEqual(similarity_score(self.left_list, self.right_list), 31)
 
+    def test_load_data(self):
+        """
+        Test load_data function.
+        """
+        left_list, right_list = load_data('01.txt')
+        self.assertEqual(left_list.typecode, 'q')
+        self.assertEqual(len(left_list), len(right_list))
+        self.assertEqual(total_distance(left_list, right_list), total_distance(list(left_list), list(right_list)))
+
 def main():
-    file_name = '../data/01.txt'
-    left_list = []
-    right_list = []
-    i = 0
-    with open(file_name, 'r') as f: input = f.read().split("\n")
-    for data in input:
-        left_list.append(int(data.split()[0]))
-        right_list.append(int(data.split()[1]))
-
-    print("Total distance: ", total_distance(left_list, right_list))
-    print("Similarity score: ", similarity_score(left_list, right_list))
+    input_file = '01.txt'
+    data = load_data(input_file)
+
+    print("Total distance: ", solve(1, data))
+    print("Similarity score: ", solve(2, data))
 
 if __name__ == "__main__":
     import sys
@@ -2,21 +2,45 @@
 # -*- coding: utf-8 -*-
 
 import unittest
-import os
+from inputs import read_lines
+from importlib.util import find_spec
+
+HAS_NUMPY = find_spec("numpy") is not None
 
 # https://adventofcode.com/2024/day/2
 
+def first_unsafe_pair(report, sign, skip=-1):
+    """
+    Find the first pair of consecutive levels that is not increasing (sign 1) or decreasing (sign -1)
+    by 1 to 3, ignoring the level at index skip.
+    Returns the index of the first level of the pair, or -1 if all the pairs are safe.
+    """
+    previous = -1
+    for i in range(len(report)):
+        if i == skip:
+            continue
+        if previous >= 0 and not 1 <= (report[i] - report[previous]) * sign <= 3:
+            return previous
+        previous = i
+    return -1
+
 def is_safe_report(report):
-    safe = True
-    if report == sorted(report) or report == sorted(report, reverse=True):
-        for i in range(len(report) - 1):
-            diff = report[i] - report[i + 1]
-            if abs(diff) > 3 or diff == 0:
-                safe = False
-                break
-    else:
-        safe = False
-    return safe
+    return first_unsafe_pair(report, 1) < 0 or first_unsafe_pair(report, -1) < 0
+
+def is_safe_report_with_problem_dampener(report):
+    """
+    Check if the report is safe after removing at most one level, in O(k) without copying the report.
+    """
+    if not report:
+        return False
+    for sign in (1, -1):
+        bad = first_unsafe_pair(report, sign)
+        if bad < 0:
+            return True
+        # the removed level must be one of the two levels of the first unsafe pair
+        if first_unsafe_pair(report, sign, skip=bad) < 0 or first_unsafe_pair(report, sign, skip=bad + 1) < 0:
+            return True
+    return False
 
 def safe_reports(reports):
     res = 0
@@ -28,11 +52,57 @@ def safe_reports(reports):
 def safe_reports_with_problem_dampener(reports):
     res = 0
     for report in reports:
-        for i in range(len(report)):
-            # delete element i
-            if is_safe_report(report[:i] + report[i + 1:]):
-                res += 1
-                break
+        if is_safe_report_with_problem_dampener(report):
+            res += 1
+    return res
+
+### Batch mode ###
+
+def safe_reports_matrix(matrix, problem_dampener=False):
+    """
+    Check a whole matrix of reports of the same length at once, one report per row.
+    Removing the level m merges the differences m-1 and m into one, so the report is safe without
+    the level m if all the differences before m-1 and after m are safe, and the merged one too.
+
+    Returns a boolean array with a value per report.
+    """
+    # imported here, the solvers that run without it do not pay for importing it
+    import numpy as np
+
+    matrix = np.asarray(matrix, dtype=np.int64)
+    n, k = matrix.shape
+    if k < 2 or (problem_dampener and k < 3):
+        return np.ones(n, dtype=bool)
+
+    res = np.zeros(n, dtype=bool)
+    diffs = np.diff(matrix, axis=1)
+    merged = matrix[:, 2:] - matrix[:, :-2]
+    ones = np.ones((n, 1), dtype=bool)
+    for sign in (1, -1):
+        safe = (diffs * sign >= 1) & (diffs * sign <= 3)
+        # prefix[:, i] tells if the differences before i are safe, suffix[:, i] if the differences from i are safe
+        prefix = np.logical_and.accumulate(np.hstack([ones, safe]), axis=1)
+        suffix = np.logical_and.accumulate(np.hstack([safe, ones])[:, ::-1], axis=1)[:, ::-1]
+        res |= prefix[:, -1]
+        if problem_dampener:
+            merged_safe = (merged * sign >= 1) & (merged * sign <= 3)
+            res |= suffix[:, 1] | prefix[:, k - 2]
+            res |= (prefix[:, :k - 2] & merged_safe & suffix[:, 2:k]).any(axis=1)
+    return res
+
+def safe_reports_batch(reports, problem_dampener=False):
+    """
+    Count the safe reports with NumPy, the reports are grouped by length into matrices.
+    """
+    by_length = {}
+    for report in reports:
+        by_length.setdefault(len(report), []).append(report)
+    res = 0
+    for length, group in by_length.items():
+        if length == 0:
+            res += 0 if problem_dampener else len(group)
+            continue
+        res += int(safe_reports_matrix(group, problem_dampener).sum())
     return res
 
 class TestAdventOfCodeDay2(unittest.TestCase):
@@ -61,26 +131,45 @@ class TestAdventOfCodeDay2(unittest.TestCase):
         """
         self.assertEqual(safe_reports_with_problem_dampener(self.reports), 4)
 
+    def test_problem_dampener_random_reports(self):
+        """
+        Compare the dampener with removing every level in turn.
+        """
+        import random
+
+        rng = random.Random(2)
+        for _ in range(2000):
+            report = [rng.randint(1, 12) for _ in range(rng.randint(1, 7))]
+            expected = any(is_safe_report(report[:i] + report[i + 1:]) for i in range(len(report)))
+            self.assertEqual(is_safe_report_with_problem_dampener(report), expected, report)
+
+    @unittest.skipIf(not HAS_NUMPY, "NumPy is not installed")
+    def test_safe_reports_batch(self):
+        """
+        Test safe_reports_batch function.
+        """
+        self.assertEqual(safe_reports_batch(self.reports), 2)
+        self.assertEqual(safe_reports_batch(self.reports, problem_dampener=True), 4)
+        reports = load_data('02.txt')
+        self.assertEqual(safe_reports_batch(reports, problem_dampener=True), safe_reports_with_problem_dampener(reports))
+
 def load_data(input_file):
-    # find the rigth data path when called from the root directory or from the src directory
-    paths = ['data/' + input_file, '2024/data/' + input_file, '../data/' + input_file]
-    for file_name in paths:
-        if os.path.exists(file_name):
-            break
-    if not os.path.exists(file_name):
-        raise FileNotFoundError(f"Input file not found: {input_file}")
-
-    reports = []
-    with open(file_name, 'r') as f: input = f.read().split("\n")
-    reports = [list(map(int, x.split())) for x in input]
+    reports = [list(map(int, line.split())) for line in read_lines(2024, file_name=input_file)]
     return reports
 
+def solve(part, data):
+    if part == 1:
+        return safe_reports(data)
+    if part == 2:
+        return safe_reports_with_problem_dampener(data)
+    raise ValueError(f"Day 2 has no part {part}, only parts 1 and 2")
+
 def main():
     input_file = '02.txt'
     reports = load_data(input_file)
 
-    print("Safe reports: ", safe_reports(reports))
-    print("Safe reports with problem dampener: ", safe_reports_with_problem_dampener(reports))
+    print("Safe reports: ", solve(1, reports))
+    print("Safe reports with problem dampener: ", solve(2, reports))
 
 if __name__ == "__main__":
     import sys
@@ -2,44 +2,78 @@
 # -*- coding: utf-8 -*-
 
 import unittest
-import os
 import re
+from inputs import input_path, open_input
 
 # https://adventofcode.com/2024/day/3
 
 
-def add_multiplications(data):
-    regex = re.compile(r'mul\((\d+),(\d+)\)')
+# a single pass over the memory finds every instruction, the operands have 1 to 3 digits
+TOKEN = re.compile(rb"mul\((\d{1,3}),(\d{1,3})\)|do\(\)|don't\(\)")
+# the start of an instruction cut at the end of a chunk, at most 11 bytes are carried to the next chunk
+PARTIAL_TOKEN = re.compile(rb"(?:m(?:u(?:l(?:\((?:\d{1,3}(?:,\d{0,3})?)?)?)?)?|d(?:o(?:n(?:'(?:t\(?)?)?|\(?)?)?)\Z")
+DO = b"do()"
+DONT = b"don't()"
+CHUNK_SIZE = 1 << 16
+
+def read_chunks(file_name, chunk_size=CHUNK_SIZE):
+    """
+    Read a file in fixed-size chunks of bytes through a memory map.
+    """
+    with open_input(2024, file_name=file_name) as memory:
+        yield from memory.chunks(chunk_size)
+
+def scan_tokens(chunks):
+    """
+    Find the instructions in a stream of chunks of bytes.
+    An instruction cut at the end of a chunk is kept and completed with the next chunk,
+    so only the current chunk and a few bytes are kept in memory.
+    """
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        partial = PARTIAL_TOKEN.search(buffer)
+        end = partial.start() if partial else len(buffer)
+        yield from TOKEN.finditer(buffer, 0, end)
+        buffer = buffer[end:]
+
+def sum_multiplications(chunks, conditional=False):
+    """
+    Add the multiplications of the memory, skipping the ones disabled by don't() if conditional.
+    """
     res = 0
-    for match in regex.finditer(data):
-        res += int(match.group(1)) * int(match.group(2))
+    enabled = True
+    for match in scan_tokens(chunks):
+        token = match.group(0)
+        if token == DO:
+            enabled = True
+        elif token == DONT:
+            enabled = False
+        elif enabled or not conditional:
+            res += int(match.group(1)) * int(match.group(2))
     return res
 
+def add_multiplications(data):
+    return sum_multiplications([data.encode()])
+
 def extract_valid_satements(data):
-    # get all the positions of the don't() and do() statements
-    dont_regex = re.compile(r'don\'t\(\)')
-    do_regex = re.compile(r'do\(\)')
-    dont_positions = [match.start() for match in dont_regex.finditer(data)]
-    do_positions = [match.start() for match in do_regex.finditer(data)]
-
-    # dontt include the statements if they are preceeded by a don't()
-    res = ""
+    # keep the text between a do() and the next don't() statement, the memory starts enabled
+    res = []
     ok_to_add = True
-    for i in range(len(data)):
-        if i in dont_positions:
+    start = 0
+    for match in re.finditer(r"don't\(\)|do\(\)", data):
+        if ok_to_add and match.group() == "don't()":
+            res.append(data[start:match.start()])
             ok_to_add = False
-        if i in do_positions:
+        elif not ok_to_add and match.group() == "do()":
+            start = match.start()
             ok_to_add = True
-        if ok_to_add:
-            res += data[i]
-    return res
+    if ok_to_add:
+        res.append(data[start:])
+    return "".join(res)
 
 def add_multiplications_with_conditional_statements(data):
-    res = 0
-    valid_statements = extract_valid_satements(data)
-    #print(valid_statements)
-    res = add_multiplications(valid_statements)
-    return res
+    return sum_multiplications([data.encode()], conditional=True)
 
 class TestAdventOfCodeDay2(unittest.TestCase):
     def setUp(self):
@@ -61,25 +95,46 @@ class TestAdventOfCodeDay2(unittest.TestCase):
         """
         self.assertEqual(add_multiplications_with_conditional_statements(self.data_2), 48)
 
+    def test_chunk_boundaries(self):
+        """
+        Test sum_multiplications with the instructions cut at every possible position.
+        """
+        data = self.data_2.encode()
+        self.assertEqual(extract_valid_satements(self.data_2), "xmul(2,4)&mul[3,7]!^do()?mul(8,5))")
+        for chunk_size in range(1, len(data) + 1):
+            chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+            self.assertEqual(sum_multiplications(chunks, conditional=True), 48)
+            self.assertEqual(sum_multiplications(chunks), 161)
+
+    def test_bounded_operands(self):
+        self.assertEqual(add_multiplications("mul(1234,5)mul(12,3456)mul(999,2)"), 1998)
+        # a long run of digits after mul( is never carried from chunk to chunk
+        data = b"mul(" + b"1" * 1000 + b",2)mul(3,4)"
+        chunks = [data[i:i + 7] for i in range(0, len(data), 7)]
+        self.assertEqual(sum_multiplications(chunks), 12)
+        buffer = b""
+        for chunk in chunks:
+            buffer += chunk
+            partial = PARTIAL_TOKEN.search(buffer)
+            buffer = buffer[partial.start():] if partial else b""
+            self.assertLessEqual(len(buffer), len(b"mul(123,456"))
+
 
 def load_data(input_file):
-    # find the rigth data path when called from the root directory or from the src directory
-    paths = ['data/' + input_file, '2024/data/' + input_file, '../data/' + input_file]
-    for file_name in paths:
-        if os.path.exists(file_name):
-            break
-    if not os.path.exists(file_name):
-        raise FileNotFoundError(f"Input file not found: {input_file}")
+    # the memory is read in chunks by the solver, only the file name is needed
+    return input_path(2024, file_name=input_file)
 
-    with open(file_name, 'r') as f: data = f.read()
-    return data
+def solve(part, file_name):
+    if part not in (1, 2):
+        raise ValueError(f"Day 3 has no part {part}, only parts 1 and 2")
+    return sum_multiplications(read_chunks(file_name), conditional=(part == 2))
 
 def main():
     input_file = '03.txt'
     data = load_data(input_file)
 
-    print("Multiplications: ", add_multiplications(data))
-    print("Multiplications with conditional statements: ", add_multiplications_with_conditional_statements(data))
+    print("Multiplications: ", solve(1, data))
+    print("Multiplications with conditional statements: ", solve(2, data))
 
 
 if __name__ == "__main__":
@@ -2,196 +2,257 @@
 # -*- coding: utf-8 -*-
 
 import unittest
-import os
-import re
+from array import array
+from inputs import input_path, load_parsed
+from grid import Grid
+from importlib.util import find_spec
+
+# NumPy takes about 100 ms to import, more than searching the puzzle grid in Python
+HAS_NUMPY = find_spec("numpy") is not None
+# the smallest grids, in cells, searched with NumPy
+NUMPY_MIN_SIZE = 250_000
 
 # https://adventofcode.com/2024/day/4
 
+# version of the parsed grid kept on disk, to change with the parser or the packed format
+PARSER_VERSION = 1
+
+def parse_grid(content):
+    return Grid.from_lines(content.views())
+
+def pack_grid(grid):
+    return {"size": array('q', [grid.width, grid.height]), "cells": bytes(grid.data)}
+
+def unpack_grid(fields):
+    (width, height) = fields["size"]
+    return Grid(width, height, fields["cells"])
+
 def load_data(input_file):
-    # find the rigth data path when called from the root directory or from the src directory
-    data = None
-    paths = ['data/' + input_file, '2024/data/' + input_file, '../data/' + input_file]
-    for file_name in paths:
-        if os.path.exists(file_name):
-            break
-    if not os.path.exists(file_name):
-        raise FileNotFoundError(f"Input file not found: {input_file}")
-
-    with open(file_name, 'r') as f: 
-        lines = f.read().splitlines()
-    data = [list(line) for line in lines]
+    # the parsed grid is cached on disk, the next runs on the same input skip the parsing
+    data = load_parsed(input_path(2024, file_name=input_file), parse_grid,
+                       "2024-04", PARSER_VERSION, pack_grid, unpack_grid)
     return data
 
 def get_strings_horizontal(data):
     """
     Get all the strings in the matrix by reading the rows.
     """
-    strings = []
-    for i in range(len(data)):
-        strings.append(''.join(data[i]))
-    return strings
+    return data.rows()
 
 def get_strings_vertical(data):
     """
     Get all the strings in the matrix by reading the columns.
     """
-    strings = []
-    for i in range(len(data)):
-        strings.append(''.join([data[j][i] for j in range(len(data))]))
-    return strings
+    return data.cols()
 
 def get_strings_diagonal_top_left_bottom_right(data):
     """
     Get all the strings in the matrix by reading the diagonals from top-left to bottom-right.
     """
-    strings = []
-    n = len(data)
-    for i in range(n):
-        x = i
-        y = 0
-        s = ''
-        while x < n and y < n and x >= 0 and y >= 0:
-            s += data[x][y]
-            x -= 1
-            y += 1
-        strings.append(s) if s != "" else None
-
-    for i in range(1, n):
-        x = n - 1
-        y = i
-        s = ''
-        while x < n and y < n and x >= 0 and y >= 0:
-            s += data[x][y]
-            x -= 1
-            y += 1
-        strings.append(s) if s != "" else None
-    return strings
+    return data.anti_diagonals()
 
 def get_strings_diagonal_top_right_bottom_left(data):
     """
     Get all the strings in the matrix by reading the diagonals from top-right to bottom-left.
     """
-    strings = []
-    n = len(data)
-    for i in range(n):
-        x = i
-        y = 0
-        s = ''
-        while x < n and y < n and x >= 0 and y >= 0:
-            s += data[x][y]
-            x += 1
-            y += 1
-        strings.append(s) if s != "" else None
-
-    for i in range(1, n):
-        x = 0
-        y = i
-        s = ''
-        while x < n and y < n and x >= 0 and y >= 0:
-            s += data[x][y]
-            x += 1
-            y += 1
-        strings.append(s) if s != "" else None
-    return strings
+    return data.diagonals()
+
+
+### Word search engine ###
+
+class WordSearch:
+    """
+    Search many words at once in every direction of a grid.
+    The words and their reversed copies are found in a single pass over each row, column and
+    diagonal of the grid, read as views of its buffer, by an Aho-Corasick automaton.
+    With NumPy, the words are counted by comparing shifted copies of the grid instead.
+    Overlapping occurrences are all found.
+    """
+    DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1), (0, -1), (-1, 0), (-1, -1), (-1, 1)]
+
+    def __init__(self, grid):
+        self.grid = grid
+
+    @staticmethod
+    def _automaton(patterns):
+        """
+        Build the transitions and the outputs (indexes of the patterns ending in each state) of the automaton.
+        """
+        transitions = [{}]
+        outputs = [[]]
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                if ch not in transitions[state]:
+                    transitions.append({})
+                    outputs.append([])
+                    transitions[state][ch] = len(transitions) - 1
+                state = transitions[state][ch]
+            outputs[state].append(index)
+
+        # breadth first, the fallback of a state is the longest suffix of its prefix that is also a prefix
+        fallback = [0] * len(transitions)
+        queue = list(transitions[0].values())
+        for state in queue:
+            for ch, next_state in transitions[state].items():
+                queue.append(next_state)
+                candidate = fallback[state]
+                while candidate and ch not in transitions[candidate]:
+                    candidate = fallback[candidate]
+                fallback[next_state] = transitions[candidate].get(ch, 0)
+                outputs[next_state] = outputs[next_state] + outputs[fallback[next_state]]
+
+        # complete the transitions, so the scan never follows the fallbacks
+        alphabet = {ch for pattern in patterns for ch in pattern}
+        for state in queue:
+            for ch in alphabet:
+                if ch not in transitions[state]:
+                    transitions[state][ch] = transitions[fallback[state]].get(ch, 0)
+        return transitions, outputs
+
+    def _matches(self, words):
+        """
+        Yield (word index, reversed, line start, line step, position of the last character in the line).
+        """
+        patterns = [word.encode() for word in words] + [word.encode()[::-1] for word in words]
+        transitions, outputs = self._automaton(patterns)
+        for (start, step, line) in self.grid.line_views():
+            state = 0
+            for i, ch in enumerate(line):
+                state = transitions[state].get(ch, 0)
+                for index in outputs[state]:
+                    yield index % len(words), index >= len(words), start, step, i
+
+    def _count_shifted(self, words):
+        # imported here, the searches that run without it do not pay for importing it
+        import numpy as np
+
+        cells = np.frombuffer(self.grid.data, dtype=np.uint8).reshape(self.grid.height, self.grid.width)
+        # one comparison of the whole grid per letter, reused by every word and direction
+        letters = {ch: cells == ch for ch in {ch for word in words for ch in word.encode()}}
+        res = dict.fromkeys(words, 0)
+        for word in words:
+            last = len(word) - 1
+            for (d_row, d_col) in self.DIRECTIONS:
+                # the first cells from which the word fits in the grid in this direction
+                rows = range(max(0, -last * d_row), self.grid.height - max(0, last * d_row))
+                cols = range(max(0, -last * d_col), self.grid.width - max(0, last * d_col))
+                if not rows or not cols:
+                    continue
+                match = np.ones((len(rows), len(cols)), dtype=bool)
+                for i, ch in enumerate(word.encode()):
+                    row, col = rows.start + i * d_row, cols.start + i * d_col
+                    match &= letters[ch][row:row + len(rows), col:col + len(cols)]
+                res[word] += int(match.sum())
+        return res
+
+    def count(self, words):
+        """
+        Count the occurrences of each word, in any direction.
+        """
+        if HAS_NUMPY and self.grid.width * self.grid.height >= NUMPY_MIN_SIZE:
+            return self._count_shifted(words)
+        res = dict.fromkeys(words, 0)
+        for (index, _, _, _, _) in self._matches(words):
+            res[words[index]] += 1
+        return res
 
+    def locate(self, words):
+        """
+        Find the first cell and the direction of each occurrence of each word.
+        """
+        res = {word: [] for word in words}
+        for (index, reversed_word, start, step, end) in self._matches(words):
+            word = words[index]
+            i = end - len(word) + 1
+            if reversed_word:
+                # the word is read backwards from the last matched cell
+                i = end
+                step = (-step[0], -step[1])
+                cell = (start[0] - i * step[0], start[1] - i * step[1])
+            else:
+                cell = (start[0] + i * step[0], start[1] + i * step[1])
+            res[word].append((cell, step))
+        return res
 
 def count_string(data, search_string):
     """
     Count the number of occurence of a string in a matrix. 
     The search can be horizontal, vertical or diagonal, in all directions.
     """
-    normal_str = search_string
-    reversed_str = search_string[::-1]
-    count = 0
-    strings = get_strings_horizontal(data) + get_strings_vertical(data) + get_strings_diagonal_top_right_bottom_left(data) + get_strings_diagonal_top_left_bottom_right(data)
-
-    # find number of occurences of the search strings
-    for s in strings:
-        count += s.count(normal_str)
-        count += s.count(reversed_str)
-    
-    return count
+    return WordSearch(data).count([search_string])[search_string]
 
 def find_locations(data, search_string):
-    locations = []
-    n = len(data)
-    search_len = len(search_string)
-    
-    # Check diagonals from top-left to bottom-right
-    for i in range(n):
-        for j in range(n):
-            if i + search_len <= n and j + search_len <= n:
-                # Check forward diagonal
-                if ''.join(data[i + k][j + k] for k in range(search_len)) == search_string:
-                    locations.append((i, j))
-                # Check backward diagonal
-                if ''.join(data[i + k][j + k] for k in range(search_len)) == search_string[::-1]:
-                    locations.append((i, j))
-    
-    # Check diagonals from top-right to bottom-left
-    for i in range(n):
-        for j in range(n):
-            if i + search_len <= n and j - search_len >= -1:
-                # Check forward diagonal
-                if ''.join(data[i + k][j - k] for k in range(search_len)) == search_string:
-                    locations.append((i, j))
-                # Check backward diagonal
-                if ''.join(data[i + k][j - k] for k in range(search_len)) == search_string[::-1]:
-                    locations.append((i, j))
-    
-    return locations
+    """
+    Find the first cell and the direction of every occurrence of a string in a matrix.
+    """
+    return WordSearch(data).locate([search_string])[search_string]
 
-def count_x_shaped_string(grid):
-    if not grid or not grid[0]:
-        return 0
-    
-    rows, cols = len(grid), len(grid[0])
+### Stencils ###
+
+# X-shaped MAS, "." is any character
+X_MAS = ["M.S",
+         ".A.",
+         "M.S"]
+
+def rotations(stencil):
+    """
+    The distinct quarter turns of a stencil.
+    """
+    res = []
+    for _ in range(4):
+        if stencil not in res:
+            res.append(stencil)
+        stencil = ["".join(line) for line in zip(*stencil[::-1])]
+    return res
+
+def count_stencil(grid, stencil, rotate=True, wildcard="."):
+    """
+    Count the positions of the grid where the stencil matches, a stencil is a list of equally long
+    strings where the wildcard matches any character. With rotate, the 4 quarter turns of the stencil are counted.
+    """
     count = 0
-    
-    def check_x_pattern(r, c):
-        patterns = 0
-        # Check if we can form an X (need 1 space in each direction)
-        if r < 1 or r >= rows-1 or c < 1 or c >= cols-1:
-            return 0
-            
-        # Possible MAS/SAM combinations for each diagonal
-        valid_patterns = ["MAS", "SAM"]
-        
-        # Check all combinations of diagonals
-        for p1 in valid_patterns:
-            for p2 in valid_patterns:
-                # Top-left to bottom-right + Top-right to bottom-left
-                if (grid[r-1][c-1] == p1[0] and grid[r][c] == p1[1] and grid[r+1][c+1] == p1[2] and
-                    grid[r-1][c+1] == p2[0] and grid[r][c] == p2[1] and grid[r+1][c-1] == p2[2]):
-                    patterns += 1
-
-        return patterns
-
-    # Check each possible center position
-    for i in range(rows):
-        for j in range(cols):
-            count += check_x_pattern(i, j)
-            
+    data = grid.data.tobytes()
+    for turn in (rotations(stencil) if rotate else [stencil]):
+        cells = [(row, col, ord(ch)) for row, line in enumerate(turn) for col, ch in enumerate(line) if ch != wildcard]
+        if not cells:
+            continue
+        height, width = len(turn), len(turn[0])
+        # the first cell of the stencil is found with bytes.find, the others are checked one by one
+        (anchor_row, anchor_col, anchor) = cells[0]
+        index = data.find(anchor)
+        while index >= 0:
+            row, col = divmod(index, grid.width)
+            top, left = row - anchor_row, col - anchor_col
+            if 0 <= top and top + height <= grid.height and 0 <= left and left + width <= grid.width:
+                if all(data[(top + r) * grid.width + left + c] == ch for (r, c, ch) in cells[1:]):
+                    count += 1
+            index = data.find(anchor, index + 1)
     return count
 
+def count_x_shaped_string(grid):
+    if not grid or not grid.width:
+        return 0
+    return count_stencil(grid, X_MAS)
+
 class TestAdventOfCodeDay(unittest.TestCase):
     def setUp(self):
         """
         Set up test data for unit tests.
         """
 
-        self.test_data = [[
-            list("MMMSXXMASM"),
-            list("MSAMXMSMSA"),
-            list("AMXSXMAAMM"),
-            list("MSAMASMSMX"),
-            list("XMASAMXAMM"),
-            list("XXAMMXXAMA"),
-            list("SMSMSASXSS"),
-            list("SAXAMASAAA"),
-            list("MAMMMXMMMM"),
-            list("MXMXAXMASX")
-        ],
+        self.test_data = [Grid.from_lines([
+            "MMMSXXMASM",
+            "MSAMXMSMSA",
+            "AMXSXMAAMM",
+            "MSAMASMSMX",
+            "XMASAMXAMM",
+            "XXAMMXXAMA",
+            "SMSMSASXSS",
+            "SAXAMASAAA",
+            "MAMMMXMMMM",
+            "MXMXAXMASX"
+        ]),
         ]
         self.answers = [9]
 
@@ -200,6 +261,23 @@ class TestAdventOfCodeDay(unittest.TestCase):
         Test count_string function.
         """
         self.assertEqual(count_string(self.test_data[0], "XMAS"), 18)
+
+    def test_word_search(self):
+        """
+        Test WordSearch on a rectangular grid with several words.
+        """
+        grid = Grid.from_lines(["ABCD",
+                                "EFGH"])
+        search = WordSearch(grid)
+        self.assertEqual(search.count(["AF", "BG", "HD", "XY", "FC"]), {"AF": 1, "BG": 1, "HD": 1, "XY": 0, "FC": 1})
+        self.assertEqual(search.locate(["HD", "FC"]), {"HD": [((1, 3), (-1, 0))], "FC": [((1, 1), (-1, 1))]})
+        self.assertEqual(WordSearch(Grid.from_lines(["AAAA"])).count(["AAA"]), {"AAA": 4})
+        words = ["XMAS", "MAS", "AXA", "S"]
+        counts = {word: len(locations) for word, locations in WordSearch(self.test_data[0]).locate(words).items()}
+        self.assertEqual(WordSearch(self.test_data[0]).count(words), counts)
+        for (cell, step) in find_locations(self.test_data[0], "XMAS"):
+            word = "".join(self.test_data[0][cell[0] + i * step[0], cell[1] + i * step[1]] for i in range(4))
+            self.assertEqual(word, "XMAS")
  
     def test_load_data(self):
         """
@@ -207,9 +285,17 @@ class TestAdventOfCodeDay(unittest.TestCase):
         """
         data = load_data('04.txt')
         print("Number of lines: ", len(data))
-        print("Number of characters in each line: ", len(data[0]))
+        print("Number of characters in each line: ", data.width)
         self.assertIsNotNone(data)
 
+    def test_packed_grid(self):
+        grid = Grid.from_lines(["XMAS",
+                                "SAMX",
+                                "MMMM"])
+        unpacked = unpack_grid(pack_grid(grid))
+        self.assertEqual(unpacked, grid)
+        self.assertEqual(count_string(unpacked, "XMAS"), count_string(grid, "XMAS"))
+
     def test_count_x_shaped_string(self):
         """
         Test count_x_shaped_string function.
@@ -218,12 +304,18 @@ class TestAdventOfCodeDay(unittest.TestCase):
             self.assertEqual(count_x_shaped_string(self.test_data[i]), self.answers[i])
 
 
+def solve(part, data):
+    if part == 1:
+        return count_string(data, "XMAS")
+    if part == 2:
+        return count_x_shaped_string(data)
+    raise ValueError(f"Day 4 has no part {part}, only parts 1 and 2")
+
 def main():
     input_file = '04.txt'
     data = load_data(input_file)
-    search_string = "XMAS"
-    print(f"Number of occurences of '{search_string}': ", count_string(data, search_string))
-    print(f"Number of occurences of X-shaped 'MAS': ", count_x_shaped_string(data))
+    print(f"Number of occurences of 'XMAS': ", solve(1, data))
+    print(f"Number of occurences of X-shaped 'MAS': ", solve(2, data))
 
 if __name__ == "__main__":
     import sys
@@ -2,47 +2,77 @@
 # -*- coding: utf-8 -*-
 
 import unittest
-from unittest.mock import patch
-import os
+from inputs import read_lines
 
 # https://adventofcode.com/2024/day/5
 
 
-# Define paths outside the function to improve readability
-data_paths = ["data/", "2024/data/", "../data/"]
+class OrderingRules:
+    """
+    Page ordering rules compiled into an index.
+    Every page gets a bit, and for every page the index keeps the bitset of the pages that must be
+    printed after it and of the pages that must be printed before it, so checking or sorting an
+    update never looks at the rules of the pages that are not in it.
+    """
+    def __init__(self, rules=()):
+        self.bit = {}
+        self.after = {}
+        self.before = {}
+        self.count = 0
+        for (a, b) in rules:
+            self.add(a, b)
+
+    def __len__(self):
+        return self.count
+
+    def _mask(self, page):
+        if page not in self.bit:
+            self.bit[page] = 1 << len(self.bit)
+            self.after[page] = 0
+            self.before[page] = 0
+        return self.bit[page]
+
+    def add(self, a, b):
+        """
+        Add the rule: page a must be printed before page b.
+        """
+        a_mask, b_mask = self._mask(a), self._mask(b)
+        if not self.after[a] & b_mask:
+            self.count += 1
+        self.after[a] |= b_mask
+        self.before[b] |= a_mask
+
+    def mask(self, pages_list):
+        res = 0
+        for page in pages_list:
+            res |= self.bit.get(page, 0)
+        return res
 
-def load_data(input_file):
-    file_name = None
-    possible_files = [path + input_file for path in data_paths]
-    # find the right data path when called from the root directory or from the src directory
-    for file_name in possible_files:
-        if os.path.exists(file_name):
-            break
-    else:
-        raise FileNotFoundError(f"Input file not found: {input_file}")
 
-    # ordering_rules is a list of page numbers (a,b) where the element a should appear before element b
+def load_data(input_file):
+    # ordering_rules is the index of the rules (a,b) where the element a should appear before element b
     # pages_to_print is a list of page numbers to print (x,...,z) 
-    ordering_rules = []
+    ordering_rules = OrderingRules()
     pages_to_print = []
-    with open(file_name, "r") as f:
-        lines = f.read().splitlines()
-    for line in lines:
-        if "|" in line:
-            ordering_rules.append((int(line.split('|')[0]), int(line.split('|')[1])))
-        if "," in line:
-            pages_to_print.append([int(x) for x in line.split(",")])
+    for line in read_lines(2024, file_name=input_file):
+        if b"|" in line:
+            a, b = line.split(b"|")
+            ordering_rules.add(int(a), int(b))
+        elif b"," in line:
+            pages_to_print.append([int(x) for x in line.split(b",")])
 
     return ordering_rules, pages_to_print
 
 def in_order(ordering_rules, pages_list):
     """
     Check if the pages to print are in the correct order.
+    A page is out of order when a page that must be printed after it was already printed.
     """
-    for i in range(len(pages_list) - 1):
-        for j in range(i+1, len(pages_list)):
-            if (pages_list[j], pages_list[i]) in ordering_rules:
-                return False    
+    printed = 0
+    for page in pages_list:
+        if ordering_rules.after.get(page, 0) & printed:
+            return False
+        printed |= ordering_rules.bit.get(page, 0)
     return True
 
 def middle_page_number_sum(ordering_rules, pages_to_print):
@@ -65,14 +95,48 @@ def get_incorrectly_ordered_pages(ordering_rules, pages_to_print):
             incorrect_pages.append(pages_list)
     return incorrect_pages
 
+def set_bits(mask):
+    """
+    Yield the set bits of a mask, lowest first.
+    """
+    while mask:
+        bit = mask & -mask
+        yield bit
+        mask ^= bit
+
 def set_pages_in_order(ordering_rules, pages_list):
     """
     Set the pages in the correct order.
+    Topological sort of the pages restricted to the rules between the pages of the list,
+    the pages without rules between them keep their relative order and the copies of a page
+    are printed together.
     """
-    for i in range(len(pages_list) - 1):
-        for j in range(i+1, len(pages_list)):
-            if (pages_list[j], pages_list[i]) in ordering_rules:
-                pages_list[i], pages_list[j] = pages_list[j], pages_list[i]
+    update = ordering_rules.mask(pages_list)
+    # copies of each page, in the order of their first occurrence
+    copies = {}
+    for page in pages_list:
+        copies[page] = copies.get(page, 0) + 1
+    first = {page: i for i, page in enumerate(copies)}
+    page_of = {ordering_rules.bit[page]: page for page in copies if page in ordering_rules.bit}
+    # number of copies of the pages of the list that must be printed before each page
+    waiting = {page: sum(copies[page_of[bit]] for bit in set_bits(ordering_rules.before.get(page, 0) & update))
+               for page in copies}
+    ready = [page for page in reversed(copies) if waiting[page] == 0]
+    sorted_pages = []
+    while ready:
+        page = ready.pop()
+        sorted_pages += [page] * copies[page]
+        released = []
+        for bit in set_bits(ordering_rules.after.get(page, 0) & update):
+            other = page_of[bit]
+            waiting[other] -= copies[page]
+            if waiting[other] == 0:
+                released.append(other)
+        released.sort(key=first.__getitem__, reverse=True)
+        ready += released
+    if len(sorted_pages) != len(pages_list):
+        raise ValueError(f"The ordering rules of the pages {pages_list} have a cycle")
+    pages_list[:] = sorted_pages
     return pages_list
 
 class TestAdventOfCodeDay(unittest.TestCase):
@@ -98,19 +162,41 @@ class TestAdventOfCodeDay(unittest.TestCase):
             sorted_incorrectly_ordered_pages.append(set_pages_in_order(ordering_rules, pages_list))
         self.assertEqual(middle_page_number_sum(ordering_rules, sorted_incorrectly_ordered_pages), 123)
 
+    def test_set_pages_in_order(self):
+        ordering_rules, _ = load_data("test_05.txt")
+        self.assertEqual(set_pages_in_order(ordering_rules, [97, 13, 75, 29, 47]), [97, 75, 47, 29, 13])
+        self.assertEqual(set_pages_in_order(ordering_rules, [5, 75, 3, 97]), [5, 3, 97, 75])
+        # a chain of rules that a single pass of swaps does not sort
+        ordering_rules = OrderingRules([(4, 3), (3, 2), (2, 1)])
+        self.assertEqual(set_pages_in_order(ordering_rules, [1, 2, 3, 4]), [4, 3, 2, 1])
+        self.assertTrue(in_order(ordering_rules, [4, 2, 1]))
+        self.assertFalse(in_order(ordering_rules, [4, 1, 2]))
+        with self.assertRaises(ValueError):
+            set_pages_in_order(OrderingRules([(1, 2), (2, 1)]), [1, 2])
+
+    def test_set_pages_in_order_duplicates(self):
+        ordering_rules = OrderingRules([(1, 2)])
+        self.assertEqual(set_pages_in_order(ordering_rules, [2, 1, 2]), [1, 2, 2])
+        self.assertEqual(set_pages_in_order(ordering_rules, [2, 5, 2, 1, 1]), [5, 1, 1, 2, 2])
+        self.assertEqual(set_pages_in_order(OrderingRules([(3, 1), (1, 2)]), [2, 2, 1, 3, 3]), [3, 3, 1, 2, 2])
+
+def solve(part, data):
+    ordering_rules, pages_to_print = data
+    if part == 1:
+        return middle_page_number_sum(ordering_rules, pages_to_print)
+    if part == 2:
+        incorrectly_ordered_pages = get_incorrectly_ordered_pages(ordering_rules, pages_to_print)
+        sorted_incorrectly_ordered_pages = []
+        for pages_list in incorrectly_ordered_pages:
+            sorted_incorrectly_ordered_pages.append(set_pages_in_order(ordering_rules, pages_list))
+        return middle_page_number_sum(ordering_rules, sorted_incorrectly_ordered_pages)
+    raise ValueError(f"Day 5 has no part {part}, only parts 1 and 2")
+
 def main():
     input_file = "05.txt"
     data = load_data(input_file)
-    ordering_rules, pages_to_print = load_data("05.txt")
-    print("Sum of middle page numbers: ", middle_page_number_sum(ordering_rules, pages_to_print))
-
-
-    incorrectly_ordered_pages = get_incorrectly_ordered_pages(ordering_rules, pages_to_print)
-    sorted_incorrectly_ordered_pages = []
-    for pages_list in incorrectly_ordered_pages:
-        sorted_incorrectly_ordered_pages.append(set_pages_in_order(ordering_rules, pages_list))
-
-    print("Sum of middle page numbers with correctly ordered pages: ", middle_page_number_sum(ordering_rules, sorted_incorrectly_ordered_pages))
+    print("Sum of middle page numbers: ", solve(1, data))
+    print("Sum of middle page numbers with correctly ordered pages: ", solve(2, data))
 
 
 
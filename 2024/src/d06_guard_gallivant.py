@@ -1,13 +1,9 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os
+from inputs import open_input
 import unittest
-import copy
-from concurrent.futures import ThreadPoolExecutor
-from concurrent.futures import ProcessPoolExecutor
-from functools import partial
-import multiprocessing as mp
+from grid import Grid
 
 # https://adventofcode.com/2024/day/6
 
@@ -24,28 +20,10 @@ GUARD_ORIENTATIONS = [UP, DOWN, LEFT, RIGHT]
 # a guard is a tuple of a position and an orientation
 guard = ((0, 0), UP)
 
-# Define paths outside the function to improve readability
-data_paths = ["data/", "2024/data/", "../data/"]
-
 def load_data(input_file):
-    file_name = None
-    possible_files = [path + input_file for path in data_paths]
-    # find the right data path when called from the root directory or from the src directory
-    for file_name in possible_files:
-        if os.path.exists(file_name):
-            break
-    else:
-        raise FileNotFoundError(f"Input file not found: {input_file}")
-
-    # floor map is a list of strings representing the floor map
-    floor_map = []
-    with open(file_name, "r") as f:
-        lines = f.read().splitlines()
-
-    floor_map.append(list(OUT_OF_BOUNDS * (len(lines[0]) + 2)))
-    for line in lines:
-        floor_map.append(list(OUT_OF_BOUNDS + line + OUT_OF_BOUNDS))
-    floor_map.append(list(OUT_OF_BOUNDS * (len(lines[0]) + 2)))
+    # floor map is a grid surrounded by a border of out of bounds cells
+    with open_input(2024, file_name=input_file) as f:
+        floor_map = Grid.from_lines(f.views(), padding=1, sentinel=OUT_OF_BOUNDS)
 
     return floor_map
 
@@ -56,7 +34,7 @@ def print_floor_map(floor_map):
     #print("\033[2J")
     print()
     # print the floor map
-    for row in floor_map:
+    for row in floor_map.lines():
         for col in row:
             if col == OBSTACLE:
                 print("#", end="")
@@ -69,55 +47,50 @@ def print_floor_map(floor_map):
         print("")
 
 def get_guard(floor_map):
-    for row in range(1, len(floor_map)-1):
-        for col in range(1, len(floor_map[0])-1):
-            if floor_map[row][col] in GUARD_ORIENTATIONS:
-                return ((row, col), floor_map[row][col])
-    return None
+    position = floor_map.find(GUARD_ORIENTATIONS)
+    if position is None:
+        return None
+    return (position, floor_map[position])
       
 def set_guard(floor_map, guard):
     ((row, col), orientation) = guard
-    floor_map[row][col] = orientation
+    floor_map[row, col] = orientation
     return floor_map
 
 def out_of_bounds(floor_map, position):
-    return position[0] < 1 or position[0] >= len(floor_map)-1 or position[1] < 1 or position[1] >= len(floor_map[0])-1
+    return position[0] < 1 or position[0] >= floor_map.height-1 or position[1] < 1 or position[1] >= floor_map.width-1
 
 def move_guard(floor_map, guard):
     (position, orientation) = guard
     if orientation == UP:
-        if floor_map[position[0]-1][position[1]] == OBSTACLE:
+        if floor_map[position[0]-1, position[1]] == OBSTACLE:
             orientation = RIGHT
         else:
             position = (position[0]-1, position[1])
-            floor_map[position[0]][position[1]] = orientation
+            floor_map[position[0], position[1]] = orientation
     elif orientation == DOWN:
-        if floor_map[position[0]+1][position[1]] == OBSTACLE:
+        if floor_map[position[0]+1, position[1]] == OBSTACLE:
             orientation = LEFT
         else:
             position = (position[0]+1, position[1])
-            floor_map[position[0]][position[1]] = orientation
+            floor_map[position[0], position[1]] = orientation
     elif orientation == LEFT:
-        if floor_map[position[0]][position[1]-1] == OBSTACLE:
+        if floor_map[position[0], position[1]-1] == OBSTACLE:
             orientation = UP
         else:
             position = (position[0], position[1]-1)
-            floor_map[position[0]][position[1]] = orientation
+            floor_map[position[0], position[1]] = orientation
     elif orientation == RIGHT:
-        if floor_map[position[0]][position[1]+1] == OBSTACLE:
+        if floor_map[position[0], position[1]+1] == OBSTACLE:
             orientation = DOWN
         else:
             position = (position[0], position[1]+1)
-            floor_map[position[0]][position[1]] = orientation
+            floor_map[position[0], position[1]] = orientation
     return (position, orientation)
 
 
 def count_visited(floor_map):
-    count = 0
-    for row in floor_map:
-        for col in row:
-            if col in GUARD_ORIENTATIONS:
-                count += 1
+    count = sum(floor_map.count(orientation) for orientation in GUARD_ORIENTATIONS)
     return count-1 # do not count the initial position
 
 def run_shift(floor_map, guard):
@@ -134,76 +107,133 @@ def run_shift(floor_map, guard):
 
 # second part
 
+# the guard always turns right when facing an obstacle
+DIRECTIONS = {UP: (-1, 0), RIGHT: (0, 1), DOWN: (1, 0), LEFT: (0, -1)}
+TURN_RIGHT = {UP: RIGHT, RIGHT: DOWN, DOWN: LEFT, LEFT: UP}
+
 def is_a_loop(floor_map, guard):
     (position, orientation) = guard
-    path = []
-    while not out_of_bounds(floor_map, position) and (guard not in path):
-        path.append(guard)
+    seen = set()
+    while not out_of_bounds(floor_map, position) and (guard not in seen):
+        seen.add(guard)
         guard = move_guard(floor_map, guard)
         (position, orientation) = guard
 
     return not out_of_bounds(floor_map, position)
 
-def progress_bar_and_traps(current, total, traps, bar_length=60):
-    progress = current / total
-    arrow = "=" * int(progress * bar_length - 1) + ">"
-    spaces = " " * (bar_length - len(arrow))
-    print(f"Progress: [{arrow + spaces}] {current}/{total} -- {traps}", end="\r")
-
-def count_traps(floor_map, guard):
-    traps = []
-    total_positions = (len(floor_map) - 2) * (len(floor_map[0]) - 2)
-    
-    def check_position(row, col):
-        test_floor_map = copy.deepcopy(floor_map)
-        test_floor_map[row][col] = "#"
-        if is_a_loop(test_floor_map, guard):
-            return (row, col)
-        return None
+def build_jump_table(floor_map):
+    """
+    Precompute, for every cell and orientation, the cell where the guard stops walking:
+    the last free cell before the next obstacle, or None if the guard walks off the map.
+    """
+    rows, cols = floor_map.height, floor_map.width
+    jump_table = {}
+    for orientation, (d_row, d_col) in DIRECTIONS.items():
+        table = [[None] * cols for _ in range(rows)]
+        # visit the cells against the walking direction, so the next cell is always solved first
+        row_order = range(rows - 2, 0, -1) if d_row > 0 else range(1, rows - 1)
+        col_order = range(cols - 2, 0, -1) if d_col > 0 else range(1, cols - 1)
+        for row in row_order:
+            for col in col_order:
+                next_cell = floor_map[row + d_row, col + d_col]
+                if next_cell == OBSTACLE:
+                    table[row][col] = (row, col)
+                elif next_cell == OUT_OF_BOUNDS:
+                    table[row][col] = None
+                else:
+                    table[row][col] = table[row + d_row][col + d_col]
+        jump_table[orientation] = table
+    return jump_table
+
+def blocks_segment(position, stop, orientation, obstacle):
+    """
+    Check if the obstacle lies on the segment the guard walks from position to stop.
+    A stop of None means the segment runs to the edge of the map.
+    """
+    (d_row, d_col) = DIRECTIONS[orientation]
+    if d_row == 0:
+        if obstacle[0] != position[0] or (obstacle[1] - position[1]) * d_col <= 0:
+            return False
+        return stop is None or (stop[1] + d_col - obstacle[1]) * d_col >= 0
+    if obstacle[1] != position[1] or (obstacle[0] - position[0]) * d_row <= 0:
+        return False
+    return stop is None or (stop[0] + d_row - obstacle[0]) * d_row >= 0
+
+def is_a_loop_with_obstacle(jump_table, guard, obstacle):
+    """
+    Check if the guard walks in a loop once an extra obstacle is placed on the map.
+    The guard jumps from turn to turn using the jump table, so the floor map is never copied or modified.
+    """
+    (position, orientation) = guard
+    seen = set()
+    while True:
+        stop = jump_table[orientation][position[0]][position[1]]
+        if blocks_segment(position, stop, orientation, obstacle):
+            (d_row, d_col) = DIRECTIONS[orientation]
+            stop = (obstacle[0] - d_row, obstacle[1] - d_col)
+        if stop is None:
+            return False
+        guard = (stop, TURN_RIGHT[orientation])
+        if guard in seen:
+            return True
+        seen.add(guard)
+        (position, orientation) = guard
 
-    with ThreadPoolExecutor() as executor:
-        futures = []
-        for row in range(1, len(floor_map) - 1):
-            for col in range(1, len(floor_map[0]) - 1):
-                futures.append(executor.submit(check_position, row, col))
-        
-        for i, future in enumerate(futures):
-            result = future.result()
-            if result:
-                traps.append(result)
-            progress_bar_and_traps(i + 1, total_positions, len(traps))
-    
-    return traps
+def trap_candidates(floor_map, guard):
+    """
+    Only the cells the guard visits in the first part can change its route.
+    Returns the candidates in the order of their first visit, each with the guard just before
+    that visit: the route up to there does not change with an obstacle on the candidate,
+    so the search for a loop starts from that guard instead of the initial one.
+    """
+    test_floor_map = floor_map.clone()
+    starts = {}
+    (position, orientation) = guard
+    initial_position = position
+    while not out_of_bounds(test_floor_map, position):
+        next_guard = move_guard(test_floor_map, guard)
+        next_position = next_guard[0]
+        if next_position != position and next_position != initial_position and not out_of_bounds(test_floor_map, next_position):
+            # a step, the guard faces the cell it enters
+            starts.setdefault(next_position, guard)
+        guard = next_guard
+        (position, orientation) = guard
+    return list(starts.items())
 
-# Move check_position outside to make it pickleable
-def check_position(args):
-    row, col, floor_map, guard = args
-    test_floor_map = copy.deepcopy(floor_map)
-    test_floor_map[row][col] = "#"
-    if is_a_loop(test_floor_map, guard):
-        return (row, col)
+def count_traps(floor_map, guard):
+    jump_table = build_jump_table(floor_map)
+    return [position for (position, start) in trap_candidates(floor_map, guard)
+            if is_a_loop_with_obstacle(jump_table, start, position)]
+
+# Worker state is set once per process to avoid pickling the jump table for every candidate
+_worker_jump_table = None
+
+def init_worker(jump_table):
+    global _worker_jump_table
+    _worker_jump_table = jump_table
+
+# Keep check_position at module level to make it pickleable
+def check_position(candidate):
+    (position, start) = candidate
+    if is_a_loop_with_obstacle(_worker_jump_table, start, position):
+        return position
     return None
 
 def count_traps_with_pool_executor(floor_map, guard):
-    traps = []
-    total_positions = (len(floor_map) - 2) * (len(floor_map[0]) - 2)
-    
-    # Create arguments list
-    positions = [
-        (row, col, floor_map, guard)
-        for row in range(1, len(floor_map) - 1)
-        for col in range(1, len(floor_map[0]) - 1)
-    ]
-    
+    # imported here, the solvers that run without a pool do not pay for importing it
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing as mp
+    jump_table = build_jump_table(floor_map)
+    positions = trap_candidates(floor_map, guard)
+
     # Use max_workers based on CPU cores
     max_workers = mp.cpu_count()
-    
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        for i, result in enumerate(executor.map(check_position, positions)):
-            if result:
-                traps.append(result)
-            progress_bar_and_traps(i + 1, total_positions, len(traps))
-    
+    chunksize = max(1, len(positions) // (max_workers * 4))
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker, initargs=(jump_table,)) as executor:
+        results = executor.map(check_position, positions, chunksize=chunksize)
+        traps = [result for result in results if result]
+
     return traps
 
 class TestAdventOfCodeDay(unittest.TestCase):
@@ -215,7 +245,7 @@ class TestAdventOfCodeDay(unittest.TestCase):
     def test_load_data(self):
         floor_map = load_data("test_06.txt")
         self.assertEqual(len(floor_map), 12)
-        self.assertEqual(len(floor_map[0]), 12)
+        self.assertEqual(floor_map.width, 12)
         guard = get_guard(floor_map)
         # print_floor_map(floor_map)
         # print(guard)
@@ -227,16 +257,16 @@ class TestAdventOfCodeDay(unittest.TestCase):
         guard = get_guard(floor_map)
         self.assertEqual(is_a_loop(floor_map, guard), False)
         floor_map_1 = floor_map
-        floor_map_1[7][4] = "#"
+        floor_map_1[7, 4] = "#"
         self.assertEqual(is_a_loop(floor_map, guard), True)
         floor_map_2 = floor_map
-        floor_map_2[8][7] = "#"
+        floor_map_2[8, 7] = "#"
         self.assertEqual(is_a_loop(floor_map, guard), True)
         floor_map_3 = floor_map
-        floor_map_3[9][4] = "#"
+        floor_map_3[9, 4] = "#"
         self.assertEqual(is_a_loop(floor_map, guard), True)
         floor_map_4 = floor_map
-        floor_map_4[8][10] = "#"
+        floor_map_4[8, 10] = "#"
         self.assertEqual(is_a_loop(floor_map, guard), True)
 
     def test_count_traps(self):
@@ -244,14 +274,47 @@ class TestAdventOfCodeDay(unittest.TestCase):
         guard = get_guard(floor_map)   
         self.assertEqual(len(count_traps_with_pool_executor(floor_map, guard)), 6)
 
+    def test_is_a_loop_with_obstacle(self):
+        floor_map = load_data("test_06.txt")
+        guard = get_guard(floor_map)
+        jump_table = build_jump_table(floor_map)
+        traps = [(7, 4), (8, 7), (8, 8), (9, 2), (9, 4), (10, 8)]
+        for position in traps:
+            self.assertTrue(is_a_loop_with_obstacle(jump_table, guard, position))
+        self.assertFalse(is_a_loop_with_obstacle(jump_table, guard, (2, 2)))
+        self.assertEqual(sorted(count_traps(floor_map, guard)), traps)
+
+    def test_trap_candidates(self):
+        floor_map = load_data("test_06.txt")
+        guard = get_guard(floor_map)
+        jump_table = build_jump_table(floor_map)
+        candidates = trap_candidates(floor_map, guard)
+        self.assertEqual(len(candidates), 40)
+        self.assertNotIn(guard[0], dict(candidates))
+        # starting from the guard just before the first visit gives the same answer as starting from the beginning
+        for (position, start) in candidates:
+            (d_row, d_col) = DIRECTIONS[start[1]]
+            self.assertEqual((start[0][0] + d_row, start[0][1] + d_col), position)
+            self.assertEqual(is_a_loop_with_obstacle(jump_table, start, position),
+                             is_a_loop_with_obstacle(jump_table, guard, position))
+
+def solve(part, floor_map):
+    guard = get_guard(floor_map)
+    if part == 1:
+        # the shift marks the visited cells, keep the loaded floor map untouched
+        test_floor_map = floor_map.clone()
+        run_shift(test_floor_map, guard)
+        return count_visited(test_floor_map)
+    if part == 2:
+        return len(count_traps(floor_map, guard))
+    raise ValueError(f"Day 6 has no part {part}, only parts 1 and 2")
+
 def main():
-    input_file = "05.txt"
-    floor_map = load_data("06.txt")
-    guard = get_guard(floor_map)   
-    path = run_shift(floor_map, guard)
-    print ("Number of steps:", count_visited(floor_map))
+    input_file = "06.txt"
+    floor_map = load_data(input_file)
+    print ("Number of steps:", solve(1, floor_map))
 
-    traps = count_traps_with_pool_executor(floor_map, guard)
+    traps = count_traps_with_pool_executor(floor_map, get_guard(floor_map))
     print("Number of traps:", len(traps))
 
 
@@ -273,7 +336,7 @@ if __name__ == "__main__":
 #     for row in range(1, len(floor_map)-1):
 #         line = []
 #         for col in range(1, len(floor_map[0])-1):
-#             if floor_map[row][col] == OBSTACLE:
+#             if floor_map[row, col] == OBSTACLE:
 #                 if line:
 #                     lines.append(line)
 #                     line = []
@@ -288,7 +351,7 @@ if __name__ == "__main__":
 #     for col in range(1, len(floor_map[0])-1):
 #         line = []
 #         for row in range(1, len(floor_map)-1):
-#             if floor_map[row][col] == OBSTACLE:
+#             if floor_map[row, col] == OBSTACLE:
 #                 if line:
 #                     lines.append(line)
 #                     line = []
@@ -1,30 +1,43 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os
+from inputs import input_path, load_parsed
 import unittest
+from array import array
 from itertools import product
 import operator
 
 # https://adventofcode.com/2024/day/7
 
-# Define paths outside the function to improve readability
-data_paths = ["data/", "2024/data/", "../data/"]
+# version of the parsed equations kept on disk, to change with the parser or the packed format
+PARSER_VERSION = 1
 
-def load_data(input_file):
-    file_name = None
-    possible_files = [path + input_file for path in data_paths]
-    # find the right data path when called from the root directory or from the src directory
-    for file_name in possible_files:
-        if os.path.exists(file_name):
-            break
-    else:
-        raise FileNotFoundError(f"Input file not found: {input_file}")
+def parse_equations(content):
+    return [Equations(line.decode()) for line in content.lines()]
 
-    with open(file_name, "r") as f:
-        lines = f.read().splitlines()
+def pack_equations(equations):
+    offsets = array('q', [0])
+    for eq in equations:
+        offsets.append(offsets[-1] + len(eq.operands))
+    try:
+        results = array('q', [eq.result for eq in equations])
+    except OverflowError:
+        # the results of the long equations do not fit 64 bits, keep them as text
+        results = b" ".join(str(eq.result).encode() for eq in equations)
+    return {"results": results,
+            "offsets": offsets,
+            "operands": array('q', [op for eq in equations for op in eq.operands])}
 
-    equations = [Equations(line) for line in lines]
+def unpack_equations(fields):
+    results, offsets, operands = fields["results"], fields["offsets"], fields["operands"]
+    if isinstance(results, bytes):
+        results = [int(result) for result in results.split()]
+    return [Equations.from_values(result, operands[offsets[i]:offsets[i+1]].tolist()) for i, result in enumerate(results)]
+
+def load_data(input_file):
+    # the parsed equations are cached on disk, the next runs on the same input skip the parsing
+    equations = load_parsed(input_path(2024, file_name=input_file), parse_equations,
+                            "2024-07", PARSER_VERSION, pack_equations, unpack_equations)
 
     return equations
 
@@ -36,6 +49,13 @@ class Equations:
         self.result = int(parts[0])
         self.operands = [int(op) for op in parts[1].split()]
 
+    @classmethod
+    def from_values(cls, result, operands):
+        res = cls.__new__(cls)
+        res.result = result
+        res.operands = operands
+        return res
+
     def __str__(self):
         return f"{self.result} = {' _ '.join(str(op) for op in self.operands)}"
     
@@ -91,11 +111,110 @@ class Equations:
                 
         return valid_solutions
 
+    @staticmethod
+    def _reverse_search(arr, target, index, operators, count):
+        """
+        Undo the operators from the last operand to the first one.
+        The last operation on arr[index] left target: it is a + only if target - arr[index] is reachable,
+        a * only if arr[index] divides target, and a | only if target ends with the digits of arr[index].
+        The branches that cannot be undone are pruned, so the search rarely goes deep.
+        With count, return the number of combinations of operators giving target, otherwise whether there is one.
+        """
+        operand = arr[index]
+        if index == 0:
+            return int(target == operand) if count else target == operand
+        res = 0
+        for op in operators:
+            if op == "+":
+                if target < operand:
+                    continue
+                previous = target - operand
+            elif op == "*":
+                if operand == 0:
+                    if target != 0:
+                        continue
+                    # any value of the first operands gives 0
+                    if not count:
+                        return True
+                    res += len(operators) ** (index - 1)
+                    continue
+                if target % operand:
+                    continue
+                previous = target // operand
+            elif op == "|":
+                shift = 10 ** len(str(operand))
+                if target < operand or (target - operand) % shift:
+                    continue
+                previous = (target - operand) // shift
+            else:
+                raise ValueError(f"Invalid operator: {op}")
+
+            found = Equations._reverse_search(arr, previous, index - 1, operators, count)
+            if count:
+                res += found
+            elif found:
+                return True
+        return res if count else False
+
     def calibration(self, operators=["+", "*"]):
-        return self._brute_force_combinatorial(self.operands, self.result, operators=operators)
+        """
+        Tell if some combination of the operators gives the result.
+        """
+        return self._reverse_search(self.operands, self.result, len(self.operands) - 1, operators, count=False)
+
+    def count_solutions(self, operators=["+", "*"]):
+        """
+        Count the combinations of the operators giving the result, without enumerating them.
+        """
+        return self._reverse_search(self.operands, self.result, len(self.operands) - 1, operators, count=True)
+
+### Batch evaluation ###
+
+# The equations are sent to the workers as plain (result, operands) tuples, much lighter to pickle
+# than the Equations objects.
+
+def equation_payload(equations):
+    return [(eq.result, tuple(eq.operands)) for eq in equations]
+
+# Keep calibrate_equation at module level to make it pickleable
+def calibrate_equation(equation):
+    """
+    Return the result of the equation for each of the totals: (with +,*, with +,*,|).
+    An equation solved with +,* is also solved with |, so the second search is skipped.
+    """
+    (result, operands) = equation
+    last = len(operands) - 1
+    if Equations._reverse_search(operands, result, last, ("+", "*"), count=False):
+        return result, result
+    if Equations._reverse_search(operands, result, last, ("|", "+", "*"), count=False):
+        return 0, result
+    return 0, 0
+
+def sum_totals(results):
+    total = calibrated_total = 0
+    for (result, calibrated_result) in results:
+        total += result
+        calibrated_total += calibrated_result
+    return total, calibrated_total
+
+def calibration_totals(equations, workers=None):
+    """
+    Compute the totals of both parts in a single scan of the equations, sharded across a process pool.
+    With workers=1 the equations are evaluated in this process.
+    """
+    payload = equation_payload(equations)
+    if workers == 1:
+        return sum_totals(map(calibrate_equation, payload))
+
+    # imported here, the solvers that run without a pool do not pay for importing it
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing as mp
+    # Use max_workers based on CPU cores
+    max_workers = workers or mp.cpu_count()
+    chunksize = max(1, len(payload) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return sum_totals(executor.map(calibrate_equation, payload, chunksize=chunksize))
 
-        #return self._brute_force(self.operands, self.result, 1, self.operands[0], operators=operators)
-        
 ### Unit tests ###
 
 class TestAdventOfCodeDay(unittest.TestCase):
@@ -124,17 +243,53 @@ class TestAdventOfCodeDay(unittest.TestCase):
         total = sum([ eq.result for eq in equations if eq.calibration(operators=["+", "*", "|"])])
         self.assertEqual(total, 11387)
         print(total)
-        
+
+    def test_count_solutions(self):
+        equations = load_data("test_07.txt")
+        for operators in (["+", "*"], ["+", "*", "|"]):
+            for eq in equations:
+                self.assertEqual(eq.count_solutions(operators),
+                                 len(eq._brute_force_combinatorial(eq.operands, eq.result, operators)))
+        self.assertEqual(Equations("190: 10 19").count_solutions(), 1)
+        self.assertEqual(Equations("0: 5 0 3 0").count_solutions(), 5)
+        self.assertEqual(Equations("4: 2 2").count_solutions(), 2)
+
+    def test_packed_equations(self):
+        equations = [Equations("190: 10 19"), Equations("3267: 81 40 27")]
+        unpacked = unpack_equations(pack_equations(equations))
+        self.assertEqual([(eq.result, eq.operands) for eq in unpacked], [(190, [10, 19]), (3267, [81, 40, 27])])
+        unpacked = unpack_equations(pack_equations([Equations("99999999999999999999: 9 9")]))
+        self.assertEqual(unpacked[0].result, 99999999999999999999)
+
+    def test_calibration_totals(self):
+        equations = load_data("test_07.txt")
+        self.assertEqual(calibration_totals(equations, workers=1), (3749, 11387))
+        self.assertEqual(calibration_totals(equations, workers=2), (3749, 11387))
+        self.assertEqual(calibration_totals([], workers=1), (0, 0))
+        self.assertEqual((solve(1, equations), solve(2, equations)), (3749, 11387))
+
+    def test_long_equation(self):
+        equation = Equations("1: " + " ".join(["1"] * 60))
+        self.assertTrue(equation.calibration(["+", "*", "|"]))
+        self.assertEqual(equation.count_solutions(["+", "*"]), 1)
+
 
 # main function
 
+def solve(part, equations):
+    if part == 1:
+        # only the +,* search, the single scan of both totals also searches with | for part 2
+        return sum(eq.result for eq in equations if eq.calibration(operators=["+", "*"]))
+    if part == 2:
+        return calibration_totals(equations, workers=1)[1]
+    raise ValueError(f"Day 7 has no part {part}, only parts 1 and 2")
+
 def main():
     input_file = "07.txt"
     equations = load_data(input_file)
-    total = sum([ eq.result for eq in equations if eq.calibration()])
+    total, calibrated_total = calibration_totals(equations)
     print("Total:", total)
-    total = sum([ eq.result for eq in equations if eq.calibration(operators=["+", "*", "|"])])
-    print("Calibrated Total:", total)
+    print("Calibrated Total:", calibrated_total)
     
 
 
@@ -1,52 +1,31 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os
+from inputs import open_input
 import unittest
 import itertools
 import math
+from grid import Grid
 
 # https://adventofcode.com/2024/day/8
 
-# Define paths outside the function to improve readability
-data_paths = ["data/", "2024/data/", "../data/"]
-
 def load_data(input_file):
-    file_name = None
-    possible_files = [path + input_file for path in data_paths]
-    # find the right data path when called from the root directory or from the src directory
-    for file_name in possible_files:
-        if os.path.exists(file_name):
-            break
-    else:
-        raise FileNotFoundError(f"Input file not found: {input_file}")
-
-    with open(file_name, "r") as f:
-        lines = f.read().splitlines()
-
-    # return a list of dictionaries where the data is the list of positions and the value is the character
-    grid = {}
-    grid_size = (len(lines[0]), len(lines))
-    for y, line in enumerate(lines):
-        for x, ch in enumerate(line):
-            
-            if ch in grid.keys():
-                grid[ch].append((x, y))
-            else:
-                grid[ch] = [(x, y)]
+    # return a dictionary where the key is the character and the value is the list of (x, y) positions
+    with open_input(2024, file_name=input_file) as f:
+        antenna_map = Grid.from_lines(f.views())
+    grid_size = (antenna_map.width, antenna_map.height)
+    grid = {ch: [(x, y) for (y, x) in positions] for ch, positions in antenna_map.positions().items()}
 
     return grid, grid_size
 
 def print_grid(grid, grid_size):
-    for y in range(grid_size[1]):
-        for x in range(grid_size[0]):
-            for key in grid.keys():
-                if (x, y) in grid[key]:
-                    print(key, end="")
-                    break
-            else:
-                print(".", end="")
-        print()
+    canvas = Grid(grid_size[0], grid_size[1])
+    for key in grid.keys():
+        for (x, y) in grid[key]:
+            # the first key found on a position is the one printed
+            if canvas[y, x] == ".":
+                canvas[y, x] = key
+    print(canvas)
     print()
 
 def antinodes(x, y):
@@ -126,6 +105,32 @@ def get_all_antinodes(grid, grid_size):
 
 ### Harmonic antinodes ###
 
+def line_range(p, step, grid_size):
+    """
+    Range of the integers i such that p + i * step is within the grid, in closed form.
+    """
+    low, high = -math.inf, math.inf
+    for (start, delta, size) in zip(p, step, grid_size):
+        if delta == 0:
+            if not 0 <= start < size:
+                return range(0)
+            continue
+        # -start <= i * delta <= size - 1 - start
+        (first, last) = (-start, size - 1 - start) if delta > 0 else (start - size + 1, start)
+        delta = abs(delta)
+        low = max(low, -(-first // delta))
+        high = min(high, last // delta)
+    return range(low, high + 1)
+
+def harmonic_step(p1, p2):
+    """
+    Smallest integer step between the points on the line defined by p1 and p2.
+    """
+    dx = p2[0] - p1[0]
+    dy = p2[1] - p1[1]
+    gcd = math.gcd(dx, dy)
+    return (dx // gcd, dy // gcd)
+
 def harmonic_antinodes(p1, p2, grid_size):
     """
     Calculate harmonic antinodes for given points p1 and p2.
@@ -140,20 +145,46 @@ def harmonic_antinodes(p1, p2, grid_size):
     Returns:
         List of valid harmonic antinode points
     """    
-    points = []
-    dx = p2[0] - p1[0]
-    dy = p2[1] - p1[1]
-    gcd = abs(dx) if dy == 0 else abs(dy) if dx == 0 else abs(math.gcd(dx, dy))
-    step_x = dx // gcd
-    step_y = dy // gcd
+    step_x, step_y = harmonic_step(p1, p2)
+    return [(p1[0] + i * step_x, p1[1] + i * step_y) for i in line_range(p1, (step_x, step_y), grid_size)]
 
-    for i in range(-grid_size[0], grid_size[0]):
-        x = p1[0] + i * step_x
-        y = p1[1] + i * step_y
-        if 0 <= x < grid_size[0] and 0 <= y < grid_size[1]:
-            points.append((x, y))
+def mark_harmonic_antinodes(bitmap, p1, p2, grid_size):
+    """
+    Mark the harmonic antinodes of p1 and p2 in a bitmap of the grid.
+    The bitmap has one byte per cell, column after column, so the antinodes of a line are
+    evenly spaced in the bitmap and are all marked by a single slice assignment.
+    """
+    height = grid_size[1]
+    step = harmonic_step(p1, p2)
+    points = line_range(p1, step, grid_size)
+    if not points:
+        return
+    first = (p1[0] + points[0] * step[0]) * height + p1[1] + points[0] * step[1]
+    stride = step[0] * height + step[1]
+    if stride < 0:
+        first, stride = first + (len(points) - 1) * stride, -stride
+    bitmap[first:first + (len(points) - 1) * stride + 1:stride] = b"\x01" * len(points)
+
+def harmonic_bitmap(antennas, grid_size):
+    """
+    Bitmap of the harmonic antinodes of every pair of antennas of a frequency.
+    """
+    bitmap = bytearray(grid_size[0] * grid_size[1])
+    for (p1, p2) in itertools.combinations(antennas, 2):
+        mark_harmonic_antinodes(bitmap, p1, p2, grid_size)
+    return bitmap
 
-    return points
+def bitmap_positions(bitmap, grid_size):
+    """
+    Positions of the marked cells of a bitmap, sorted.
+    """
+    height = grid_size[1]
+    res = []
+    index = bitmap.find(1)
+    while index >= 0:
+        res.append(divmod(index, height))
+        index = bitmap.find(1, index + 1)
+    return res
 
 def get_antinodes_for_frequency(grid, grid_size, frequency):
     """
@@ -168,47 +199,122 @@ def get_antinodes_for_frequency(grid, grid_size, frequency):
         frequency (int): The frequency for which to calculate antinodes.
 
             Returns:
-        list: A list of antinode positions for the given frequency, with positions out of bounds removed.
+        list: A sorted list of antinode positions for the given frequency.
     
     """
-    antinodes_list = []
-    antennas_pairs = list(itertools.combinations(grid[frequency], 2))
-    for antennas in antennas_pairs:
-        p1 = min(antennas)
-        p2 = max(antennas)
-        antinodes_list = antinodes_list + harmonic_antinodes(p1, p2, grid_size)
+    return bitmap_positions(harmonic_bitmap(grid[frequency], grid_size), grid_size)
 
-    return remove_out_of_bounds(antinodes_list, grid_size)
+# Keep frequency_bitmap at module level to make it pickleable
+def frequency_bitmap(args):
+    (antennas, grid_size) = args
+    return bytes(harmonic_bitmap(antennas, grid_size))
 
-def get_harmonic_antinodes(grid, grid_size):
+def get_harmonic_antinodes(grid, grid_size, workers=1):
     """
     Identifies and returns the harmonic antinodes from a given grid.
-    This function processes a grid to find harmonic antinodes, which are points
-    where the amplitude of a wave is at a maximum. It skips grid keys that are
-    either '.' or '#', and only considers keys with more than one element. The
-    function then collects antinodes for each frequency and ensures they are
-    within the grid bounds.
+    It skips grid keys that are either '.' or '#', and only considers keys with more than one element.
+    The antinodes of each frequency are marked in a bitmap of the grid, the bitmaps are merged at the end.
+    With workers other than 1, the frequencies are processed in parallel by a process pool.
     
     Args:
         grid (dict): A dictionary representing the grid where keys are 
                      frequencies and values are lists of coordinates.
-        grid_size (tuple): A tuple representing the size of the grid (rows, columns).
+        grid_size (tuple): A tuple representing the size of the grid (width, height).
+        workers (int): Number of processes, the number of cores if None.
 
     Returns:
-        set: A set of coordinates representing the harmonic antinodes within the grid bounds.
+        list: A sorted list of the harmonic antinodes.
 
     """
-    antinodes_list = set()
-    for key in grid.keys():
-        if key in [".", "#"]:
-            continue
-        if len(grid[key]) > 1:
-            antinodes_list_key = set(grid[key])
-            antinodes_list_key = antinodes_list.union(get_antinodes_for_frequency(grid, grid_size, key))
-            antinodes_list = antinodes_list.union(antinodes_list_key)
+    frequencies = [(antennas, grid_size) for key, antennas in grid.items()
+                   if key not in [".", "#"] and len(antennas) > 1]
+    if workers == 1:
+        bitmaps = map(frequency_bitmap, frequencies)
+    else:
+        # imported here, the solvers that run without a pool do not pay for importing it
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing as mp
+        with ProcessPoolExecutor(max_workers=workers or mp.cpu_count()) as executor:
+            bitmaps = list(executor.map(frequency_bitmap, frequencies))
 
-    res = remove_out_of_bounds(antinodes_list, grid_size)
-    return res
+    merged = 0
+    for bitmap in bitmaps:
+        merged |= int.from_bytes(bitmap, "little")
+    bitmap = merged.to_bytes(grid_size[0] * grid_size[1], "little")
+    return bitmap_positions(bitmap, grid_size)
+
+### Incremental index ###
+
+class AntinodeIndex:
+    """
+    Antinodes of a set of antennas, kept up to date as antennas are added or removed.
+    Every antinode cell counts the pairs of antennas of each frequency that put an antinode there,
+    so adding or removing an antenna only visits the pairs it belongs to, and the number of
+    unique antinodes is always known.
+    """
+    def __init__(self, grid_size, harmonic=False):
+        self.grid_size = grid_size
+        self.harmonic = harmonic
+        # frequency -> list of antenna positions
+        self.antennas = {}
+        # frequency -> {cell: number of pairs of antennas with an antinode on the cell}
+        self.counts = {}
+        # cell -> number of frequencies with an antinode on the cell
+        self.cells = {}
+
+    @classmethod
+    def from_grid(cls, grid, grid_size, harmonic=False):
+        index = cls(grid_size, harmonic)
+        for key, positions in grid.items():
+            if key in [".", "#"]:
+                continue
+            for position in positions:
+                index.add_antenna(key, position)
+        return index
+
+    def __len__(self):
+        return len(self.cells)
+
+    def antinodes(self):
+        return sorted(self.cells)
+
+    def _pair_antinodes(self, p1, p2):
+        if self.harmonic:
+            return harmonic_antinodes(p1, p2, self.grid_size)
+        width, height = self.grid_size
+        return [(x, y) for (x, y) in antinodes(p1, p2) if 0 <= x < width and 0 <= y < height]
+
+    def _update(self, frequency, position, delta):
+        counts = self.counts.setdefault(frequency, {})
+        for other in self.antennas[frequency]:
+            if other == position:
+                continue
+            for cell in self._pair_antinodes(position, other):
+                count = counts.get(cell, 0) + delta
+                if count:
+                    counts[cell] = count
+                else:
+                    del counts[cell]
+                # the cell changes for the frequency when its first pair comes or its last pair goes
+                if count == 0 or count == delta:
+                    frequencies = self.cells.get(cell, 0) + delta
+                    if frequencies:
+                        self.cells[cell] = frequencies
+                    else:
+                        del self.cells[cell]
+
+    def add_antenna(self, frequency, position):
+        antennas = self.antennas.setdefault(frequency, [])
+        if position in antennas:
+            raise ValueError(f"Antenna {frequency} already at {position}")
+        antennas.append(position)
+        self._update(frequency, position, 1)
+
+    def remove_antenna(self, frequency, position):
+        if position not in self.antennas.get(frequency, []):
+            raise ValueError(f"No antenna {frequency} at {position}")
+        self._update(frequency, position, -1)
+        self.antennas[frequency].remove(position)
 
 ### Unit tests ###
 
@@ -243,21 +349,60 @@ class TestAdventOfCodeDay(unittest.TestCase):
         print_grid(grid, grid_size)
         self.assertEqual(len(antinodes_list), 34)
         print(grid["#"])
-       
+
+    def test_harmonic_antinodes_closed_form(self):
+        grid_size = (12, 7)
+        for (p1, p2) in [((3, 2), (5, 3)), ((5, 3), (3, 2)), ((4, 0), (4, 6)), ((0, 1), (11, 1)), ((2, 5), (8, 2))]:
+            step = harmonic_step(p1, p2)
+            expected = sorted({(p1[0] + i * step[0], p1[1] + i * step[1]) for i in range(-20, 20)
+                               if 0 <= p1[0] + i * step[0] < grid_size[0] and 0 <= p1[1] + i * step[1] < grid_size[1]})
+            self.assertEqual(sorted(harmonic_antinodes(p1, p2, grid_size)), expected)
+            self.assertEqual(get_antinodes_for_frequency({"a": [p1, p2]}, grid_size, "a"), expected)
+
+    def test_antinode_index(self):
+        grid, grid_size = load_data("test_08.txt")
+        for (harmonic, get_antinodes) in [(False, get_all_antinodes), (True, get_harmonic_antinodes)]:
+            index = AntinodeIndex.from_grid(grid, grid_size, harmonic=harmonic)
+            self.assertEqual(index.antinodes(), get_antinodes(grid, grid_size))
+            self.assertEqual(len(index), 34 if harmonic else 14)
+
+            # move an antenna, then put it back
+            index.remove_antenna("A", (6, 5))
+            index.add_antenna("A", (2, 3))
+            moved = dict(grid, A=[(8, 8), (9, 9), (2, 3)])
+            self.assertEqual(index.antinodes(), get_antinodes(moved, grid_size))
+            index.remove_antenna("A", (2, 3))
+            index.add_antenna("A", (6, 5))
+            self.assertEqual(index.antinodes(), get_antinodes(grid, grid_size))
+
+            index.add_antenna("B", (0, 0))
+            self.assertEqual(index.antinodes(), get_antinodes(grid, grid_size))
+            with self.assertRaises(ValueError):
+                index.remove_antenna("B", (1, 1))
+            with self.assertRaises(ValueError):
+                index.add_antenna("B", (0, 0))
+
+    def test_parallel_frequencies(self):
+        grid, grid_size = load_data("test_08.txt")
+        self.assertEqual(get_harmonic_antinodes(grid, grid_size, workers=2), get_harmonic_antinodes(grid, grid_size))
 
 
 # main function
 
 
+def solve(part, data):
+    grid, grid_size = data
+    if part == 1:
+        return len(get_all_antinodes(grid, grid_size))
+    if part == 2:
+        return len(get_harmonic_antinodes(grid, grid_size))
+    raise ValueError(f"Day 8 has no part {part}, only parts 1 and 2")
+
 def main():
     input_file = "08.txt"
-    grid, grid_size = load_data("08.txt")
-    # print(grid.keys())
-    antinodes_list = get_all_antinodes(grid, grid_size)
-    print(len(antinodes_list))
-    
-    antinodes_list = get_harmonic_antinodes(grid, grid_size)
-    print(len(antinodes_list))
+    data = load_data(input_file)
+    print(solve(1, data))
+    print(solve(2, data))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+
+# Compact character grid shared by the 2024 grid puzzles.
+# The cells are stored row by row in a flat bytearray, so a row, a column or a diagonal
+# is a strided memoryview over the same buffer instead of a new string or list.
+
+
+class Grid:
+    def __init__(self, width, height, data=None, fill="."):
+        self.width = width
+        self.height = height
+        if data is None:
+            data = bytearray(fill.encode() * (width * height))
+        if len(data) != width * height:
+            raise ValueError(f"Grid data has {len(data)} cells, expected {width * height}")
+        # bytes while the buffer is shared by clones, bytearray once this grid owns it
+        self._data = data
+
+    @classmethod
+    def from_lines(cls, lines, padding=0, sentinel="O"):
+        """
+        Build a grid from equally long lines, str or bytes-like, e.g. the views of a mapped input.
+        The grid can be surrounded by `padding` rows and columns of `sentinel` cells,
+        so neighbours of the border cells can be read without bounds checks.
+        """
+        width = None
+        height = 2 * padding
+        border = sentinel.encode() * padding
+        data = bytearray()
+        for line in lines:
+            if isinstance(line, str):
+                line = line.encode()
+            if width is None:
+                width = len(line) + 2 * padding
+                data += border * width
+            elif len(line) + 2 * padding != width:
+                raise ValueError(f"Line has {len(line)} cells, expected {width - 2 * padding}")
+            data += border
+            data += line
+            data += border
+            height += 1
+        if width is None:
+            raise ValueError("Grid has no line")
+        data += border * width
+        return cls(width, height, data)
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, position):
+        (row, col) = position
+        return chr(self._data[row * self.width + col])
+
+    def __setitem__(self, position, value):
+        (row, col) = position
+        if not isinstance(self._data, bytearray):
+            # copy on write: take ownership of the buffer shared with the clones
+            self._data = bytearray(self._data)
+        self._data[row * self.width + col] = ord(value)
+
+    def __eq__(self, other):
+        return isinstance(other, Grid) and (self.width, self.height) == (other.width, other.height) and self._data == other._data
+
+    def __str__(self):
+        return "\n".join(self.lines())
+
+    @property
+    def data(self):
+        """
+        Read-only view of the whole buffer.
+        """
+        return memoryview(self._data).toreadonly()
+
+    def in_bounds(self, row, col):
+        return 0 <= row < self.height and 0 <= col < self.width
+
+    def clone(self):
+        """
+        Copy-on-write clone, the buffer is only copied by the first grid that writes to it.
+        """
+        if isinstance(self._data, bytearray):
+            self._data = bytes(self._data)
+        return Grid(self.width, self.height, self._data)
+
+    def count(self, value):
+        return self._data.count(value.encode())
+
+    def find(self, values):
+        """
+        Find the first cell holding one of the characters in `values`, in reading order.
+        """
+        indexes = [index for index in (self._data.find(value.encode()) for value in values) if index >= 0]
+        if not indexes:
+            return None
+        return divmod(min(indexes), self.width)
+
+    def positions(self, skip=""):
+        """
+        Map every character of the grid to the list of its (row, col) positions in reading order.
+        """
+        res = {}
+        skipped = set(skip.encode())
+        for index, value in enumerate(self._data):
+            if value not in skipped:
+                res.setdefault(chr(value), []).append(divmod(index, self.width))
+        return res
+
+    ### Views ###
+
+    def row(self, row):
+        start = row * self.width
+        return self.data[start:start + self.width]
+
+    def col(self, col):
+        return self.data[col::self.width]
+
+    def diagonal(self, row, col):
+        """
+        View from (row, col) towards the bottom-right corner.
+        """
+        length = min(self.height - row, self.width - col)
+        start = row * self.width + col
+        step = self.width + 1
+        return self.data[start:start + (length - 1) * step + 1:step]
+
+    def anti_diagonal(self, row, col):
+        """
+        View from (row, col) towards the bottom-left corner.
+        """
+        length = min(self.height - row, col + 1)
+        start = row * self.width + col
+        step = self.width - 1
+        if step == 0:
+            return self.data[start:start + 1]
+        return self.data[start:start + (length - 1) * step + 1:step]
+
+    def rows(self):
+        return [self.row(row) for row in range(self.height)]
+
+    def cols(self):
+        return [self.col(col) for col in range(self.width)]
+
+    def diagonals(self):
+        """
+        All the top-left to bottom-right diagonals, starting on the first column then on the first row.
+        """
+        return [self.diagonal(row, 0) for row in range(self.height - 1, -1, -1)] + \
+               [self.diagonal(0, col) for col in range(1, self.width)]
+
+    def anti_diagonals(self):
+        """
+        All the top-right to bottom-left diagonals, starting on the first row then on the last column.
+        """
+        return [self.anti_diagonal(0, col) for col in range(self.width)] + \
+               [self.anti_diagonal(row, self.width - 1) for row in range(1, self.height)]
+
+    def line_views(self):
+        """
+        Every row, column and diagonal with the position of its first cell and its direction,
+        as a list of ((row, col), (d_row, d_col), view).
+        """
+        res = [((row, 0), (0, 1), self.row(row)) for row in range(self.height)]
+        res += [((0, col), (1, 0), self.col(col)) for col in range(self.width)]
+        res += [((row, 0), (1, 1), self.diagonal(row, 0)) for row in range(self.height - 1, -1, -1)]
+        res += [((0, col), (1, 1), self.diagonal(0, col)) for col in range(1, self.width)]
+        res += [((0, col), (1, -1), self.anti_diagonal(0, col)) for col in range(self.width)]
+        res += [((row, self.width - 1), (1, -1), self.anti_diagonal(row, self.width - 1)) for row in range(1, self.height)]
+        return res
+
+    def lines(self):
+        return [self.row(row).tobytes().decode() for row in range(self.height)]
+
+
+### Unit tests ###
+
+class TestGrid(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up test data for unit tests.
+        """
+        self.lines = ["abcd", "efgh", "ijkl"]
+
+    def test_views(self):
+        grid = Grid.from_lines(self.lines)
+        self.assertEqual(len(grid), 3)
+        self.assertEqual(grid[1, 2], "g")
+        self.assertEqual(grid.row(2).tobytes(), b"ijkl")
+        self.assertEqual(grid.col(1).tobytes(), b"bfj")
+        self.assertEqual(grid.diagonal(0, 1).tobytes(), b"bgl")
+        self.assertEqual(grid.anti_diagonal(0, 2).tobytes(), b"cfi")
+        self.assertEqual([d.tobytes() for d in grid.diagonals()], [b"i", b"ej", b"afk", b"bgl", b"ch", b"d"])
+        self.assertEqual([d.tobytes() for d in grid.anti_diagonals()], [b"a", b"be", b"cfi", b"dgj", b"hk", b"l"])
+        for (start, step, view) in grid.line_views():
+            cells = [grid[start[0] + i * step[0], start[1] + i * step[1]] for i in range(len(view))]
+            self.assertEqual("".join(cells), view.tobytes().decode())
+
+    def test_from_bytes(self):
+        lines = [line.encode() for line in self.lines]
+        self.assertEqual(Grid.from_lines(lines), Grid.from_lines(self.lines))
+        self.assertEqual(Grid.from_lines(iter(memoryview(line) for line in lines)), Grid.from_lines(self.lines))
+        with self.assertRaises(ValueError):
+            Grid.from_lines([])
+
+    def test_padding(self):
+        grid = Grid.from_lines(self.lines, padding=1, sentinel="O")
+        self.assertEqual((grid.width, grid.height), (6, 5))
+        self.assertEqual(grid.lines()[0], "OOOOOO")
+        self.assertEqual(grid.row(1).tobytes(), b"OabcdO")
+        self.assertEqual(grid.find("k"), (3, 3))
+        # the first cell in reading order, whatever the order of the characters
+        self.assertEqual(grid.find("kc"), (1, 3))
+        self.assertIsNone(grid.find("xyz"))
+        self.assertEqual(grid.positions(skip="O")["f"], [(2, 2)])
+
+    def test_clone(self):
+        grid = Grid.from_lines(self.lines)
+        clone = grid.clone()
+        self.assertEqual(grid, clone)
+        clone[0, 0] = "#"
+        self.assertEqual(grid[0, 0], "a")
+        self.assertEqual(clone[0, 0], "#")
+        grid[2, 3] = "#"
+        self.assertEqual(clone[2, 3], "l")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "test":
+        # Run tests
+        unittest.main(argv=[sys.argv[0]])
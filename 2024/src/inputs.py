@@ -0,0 +1 @@
+../../advent/inputs.py
\ No newline at end of file
@@ -0,0 +1 @@
+# Runner for the solvers of every year, see `python -m advent --help`
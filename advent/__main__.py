@@ -0,0 +1,92 @@
+import sys
+import time
+
+import click
+
+from advent.registry import discover, select, solver_name
+
+# Usage, from any directory with the repository on the python path:
+#   python -m advent --year 2024 --day 6 --part 2
+#   python -m advent --year 2023-2024 --day 1-5
+#   python -m advent --all --jobs 4 --timeout 60
+#   python -m advent --year 2024 --day 6 --part 2 --profile sample --top 15
+# The answers of the parts whose code and input did not change are read from the previous runs,
+# unless --force is given.
+# With --profile the solvers run under a profiler, one at a time so they do not share the CPU, and write
+# their collapsed stacks and top functions to .advent/profiles/. Their timings and answers are not recorded.
+
+
+@click.command()
+@click.option('--year', default=None, help="Year or range of years, e.g. 2024 or 2023-2024")
+@click.option('--day', default=None, help="Day or range of days, e.g. 6, 1-5 or 1-3,8")
+@click.option('--part', default=None, help="Part to solve, 1 or 2")
+@click.option('--all', 'run_all', is_flag=True, help="Run every solver", default=False)
+@click.option('--list', 'list_only', is_flag=True, help="List the solvers without running them", default=False)
+@click.option('--jobs', default=None, type=click.INT, help="Number of solvers running in parallel, one per core by default")
+@click.option('--timeout', default=None, type=click.FLOAT, help="Seconds before a solver is killed")
+@click.option('--memory-limit', default=None, type=click.INT, help="Memory limit of each solver, in MiB")
+@click.option('--force', is_flag=True, help="Run the solvers even if their answer is known", default=False)
+@click.option('--profile', default=None, type=click.Choice(['cprofile', 'sample']),
+              help="Profile the solvers, deterministic (cprofile) or sampling")
+@click.option('--top', default=20, type=click.INT, help="Number of functions in the profile summaries")
+def main(year, day, part, run_all, list_only, jobs, timeout, memory_limit, force, profile, top):
+    if not (run_all or year or day or part):
+        raise click.UsageError("Select solvers with --year, --day and --part, or use --all")
+
+    solvers = select(discover(), years=year, days=day, parts=part)
+    if not solvers:
+        print("No solver found")
+        sys.exit(1)
+
+    if list_only:
+        for solver in solvers:
+            print(solver_name(solver))
+        return
+
+    # the runner is only imported to run the solvers, listing them only reads the directories
+    from advent.answers import answer_key, load_answers, lookup, record, save_answers
+    from advent.runner import format_result
+    from advent.suite import run_suite, load_history, update_history
+
+    memory_limit = memory_limit * 2**20 if memory_limit else None
+    results = []
+    start = time.perf_counter()
+    if profile:
+        from functools import partial
+        from advent.profiling import profile_solver, read_summary
+        func = partial(profile_solver, mode=profile, top=top)
+        for result in run_suite(solvers, workers=jobs or 1, timeout=timeout, memory_limit=memory_limit, func=func):
+            print(format_result(result), flush=True)
+            summary = read_summary(result.solver, profile) if result.error is None else None
+            if summary:
+                print(summary, flush=True)
+            results.append(result)
+    else:
+        answers = load_answers()
+        keys = {solver: answer_key(solver) for solver in solvers}
+        to_run = []
+        for solver in solvers:
+            result = None if force else lookup(answers, solver, keys[solver])
+            if result is None:
+                to_run.append(solver)
+            else:
+                print(format_result(result), flush=True)
+                results.append(result)
+        for result in run_suite(to_run, workers=jobs, timeout=timeout, memory_limit=memory_limit, history=load_history()):
+            print(format_result(result), flush=True)
+            results.append(result)
+            record(answers, result, keys[result.solver])
+        update_history([result for result in results if not result.cached])
+        save_answers(answers)
+
+    errors = sum(result.error is not None for result in results)
+    cached = sum(result.cached for result in results)
+    # the CPU time actually spent by this run
+    total_cpu = sum(result.cpu for result in results if not result.cached)
+    print(f"{len(solvers)} parts, {cached} cached, wall {time.perf_counter() - start:.3f}s, cpu {total_cpu:.3f}s, {errors} errors")
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
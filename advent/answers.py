@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import ast
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from advent.inputs import LAYOUTS, input_path
+from advent.registry import ROOT, STATE_DIR, LEVEL, SCRIPT, Solver
+from advent.runner import Result
+
+# Answers of the previous runs, so a part whose code and input did not change is not solved again.
+#
+# An answer is keyed by the hash of the sources of its solver, with the modules of its directory
+# that it imports, and by the hash of the inputs of its day. Any change to one of them gives a new
+# key, the stale answers are never read again and are evicted with the least recently used ones.
+
+ANSWERS_FILE = os.path.join(STATE_DIR, "answers.json")
+MAX_ANSWERS = 1024
+
+
+def imported_modules(path):
+    """
+    Names of the top-level modules imported by a source file.
+    """
+    with open(path, "rb") as f:
+        tree = ast.parse(f.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.add(node.module.split(".")[0])
+    return names
+
+
+def source_files(solver):
+    """
+    The solver file and the modules of its directory it imports, directly or not, sorted.
+    """
+    src = os.path.dirname(solver.path)
+    pending = [solver.path]
+    if solver.kind == LEVEL:
+        # the runner reads the input of the 2021 solvers with their loader
+        pending.append(os.path.join(src, "loader.py"))
+    # every year reads its inputs through the shared input layer
+    res = {os.path.join(ROOT, "advent", "inputs.py")}
+    while pending:
+        path = pending.pop()
+        if path in res or not os.path.exists(path):
+            continue
+        res.add(path)
+        for name in imported_modules(path):
+            pending.append(os.path.join(src, f"{name}.py"))
+    return sorted(res)
+
+
+def input_files(solver):
+    """
+    The inputs of the day of the solver that exist, in every variant of the layout of its year.
+    """
+    res = []
+    for variant in LAYOUTS.get(solver.year, {}):
+        try:
+            res.append(input_path(solver.year, solver.day, variant))
+        except FileNotFoundError:
+            pass
+    return res
+
+
+def answer_key(solver):
+    """
+    Hash of the solver sources and of its inputs, with the part it solves.
+    """
+    digest = hashlib.sha256(f"{solver.year}/{solver.day}/{solver.part}/{solver.kind}".encode())
+    for path in source_files(solver) + input_files(solver):
+        with open(path, "rb") as f:
+            content = f.read()
+        digest.update(os.path.relpath(path, ROOT).encode() + b"\0")
+        digest.update(hashlib.sha256(content).digest())
+    return digest.hexdigest()
+
+
+def load_answers(file_name=ANSWERS_FILE):
+    try:
+        with open(file_name, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def lookup(answers, solver, key):
+    """
+    The cached Result of a solver, with the timing of the run that found it, or None.
+    """
+    entry = answers.get(key)
+    if entry is None:
+        return None
+    entry["used"] = time.time()
+    return Result(solver, entry["answer"], entry["wall"], entry["cpu"], entry["max_rss"], None, cached=True)
+
+
+def record(answers, result, key):
+    """
+    Keep the answer of a Result, unless it failed or its answer cannot be saved as is.
+    """
+    if result.error is not None or result.cached or not isinstance(result.answer, (int, str)):
+        return
+    answers[key] = {"solver": f"{result.solver.year}/{result.solver.day}/{result.solver.part}",
+                    "answer": result.answer, "wall": result.wall, "cpu": result.cpu,
+                    "max_rss": result.max_rss, "used": time.time()}
+
+
+def save_answers(answers, file_name=ANSWERS_FILE, max_answers=MAX_ANSWERS):
+    """
+    Save the answers, without the least recently used ones past max_answers.
+    """
+    keys = sorted(answers, key=lambda key: answers[key]["used"], reverse=True)
+    for key in keys[max_answers:]:
+        del answers[key]
+    os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    tmp_name = f"{file_name}.{os.getpid()}.tmp"
+    with open(tmp_name, "w") as f:
+        json.dump(answers, f, indent=2, sort_keys=True)
+    os.replace(tmp_name, file_name)
+    return answers
+
+
+### Unit tests ###
+
+class TestAnswers(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up test scripts for unit tests.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, name, code):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w") as f:
+            f.write(code)
+        return path
+
+    def test_source_files(self):
+        helper = self.write("helper.py", "import os\nfrom inputs import input_path\n")
+        path = self.write("d01p1_test.py", "import helper, sys\nfrom collections import deque\n")
+        solver = Solver(2000, 1, 1, path, SCRIPT)
+        self.assertEqual(source_files(solver), sorted([path, helper, os.path.join(ROOT, "advent", "inputs.py")]))
+        key = answer_key(solver)
+        self.assertEqual(answer_key(solver), key)
+        self.write("helper.py", "import os\n")
+        self.assertNotEqual(answer_key(solver), key)
+        self.assertNotEqual(answer_key(solver._replace(part=2)), answer_key(solver))
+
+    def test_inputs(self):
+        solver = Solver(2023, 4, 1, os.path.join(ROOT, "2023", "src", "d04p1.scratchcards.py"), SCRIPT)
+        self.assertEqual([os.path.basename(path) for path in input_files(solver)], ["04_input.txt", "04_test_cases.txt"])
+
+    def test_store(self):
+        file_name = os.path.join(self.tmp_dir.name, "answers.json")
+        solvers = [Solver(2024, day, 1, "", SCRIPT) for day in (1, 2, 3)]
+        answers = {}
+        record(answers, Result(solvers[0], 12, 2.5, 2.0, 1024, None), "a")
+        record(answers, Result(solvers[1], None, 0.1, 0.1, 1024, "ValueError"), "b")
+        record(answers, Result(solvers[2], "34", 0.5, 0.5, 1024, None), "c")
+        self.assertEqual(sorted(answers), ["a", "c"])
+        answers["a"]["used"] -= 10
+        save_answers(answers, file_name, max_answers=1)
+
+        answers = load_answers(file_name)
+        self.assertIsNone(lookup(answers, solvers[0], "a"))
+        result = lookup(answers, solvers[2], "c")
+        self.assertEqual((result.answer, result.wall, result.cached), ("34", 0.5, True))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "test":
+        # Run tests
+        unittest.main(argv=[sys.argv[0]])
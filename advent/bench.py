@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import contextlib
+import csv
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import time
+import unittest
+from collections import namedtuple
+
+from advent.generators import GENERATORS, write_input
+from advent.inputs import input_path
+from advent.registry import ROOT, STATE_DIR, discover, select
+from advent.runner import load_module
+
+# Benchmarks of the solver functions.
+#
+# Every benchmark loads its input once, then the solver function is called a few times to warm up
+# and `repeat` more times to take the samples. Fast functions are called several times per sample,
+# so a sample always lasts at least `min_time` seconds. The median and the interquartile range of
+# the samples are compared with a baseline saved by a previous run.
+# With --scale the benchmarks run on generated inputs of each scale instead of the puzzle input,
+# and --csv writes the timings to chart the runtime against the input size.
+# With --imports the startup of the solver modules is measured instead: each sample imports a module
+# in a fresh interpreter, and python -X importtime tells which of its imports cost the most.
+#
+#   python -m advent.bench --save-baseline
+#   python -m advent.bench --filter 2024/06 --threshold 0.2
+#   python -m advent.bench --filter 2024/01 --scale 1000,10000,100000 --csv day1.csv
+#   python -m advent.bench --imports --filter 2024
+
+BASELINE_FILE = os.path.join(STATE_DIR, "bench_baseline.json")
+
+Stats = namedtuple("Stats", ["name", "median", "q1", "q3", "samples", "number", "scale"], defaults=[None])
+
+# name -> (year, day, input file, setup function)
+# the setup loads the input file and returns the function to time
+BENCHMARKS = {}
+
+
+def benchmark(name, year, day, input_file):
+    def register(setup):
+        BENCHMARKS[name] = (year, day, input_file, setup)
+        return setup
+    return register
+
+
+def solver_module(year, day):
+    solver = select(discover(), years=year, days=day)[-1]
+    return load_module(solver.path)
+
+
+### Benchmarks ###
+
+@benchmark("2024/01 total_distance", 2024, 1, "01.txt")
+def bench_total_distance(input_file):
+    module = solver_module(2024, 1)
+    left_list, right_list = module.load_data(input_file)
+    return lambda: module.total_distance(left_list, right_list)
+
+@benchmark("2024/01 similarity_score", 2024, 1, "01.txt")
+def bench_similarity_score(input_file):
+    module = solver_module(2024, 1)
+    left_list, right_list = module.load_data(input_file)
+    return lambda: module.similarity_score(left_list, right_list)
+
+@benchmark("2024/02 safe_reports_with_problem_dampener", 2024, 2, "02.txt")
+def bench_safe_reports_with_problem_dampener(input_file):
+    module = solver_module(2024, 2)
+    reports = module.load_data(input_file)
+    return lambda: module.safe_reports_with_problem_dampener(reports)
+
+@benchmark("2024/04 count_string", 2024, 4, "04.txt")
+def bench_count_string(input_file):
+    module = solver_module(2024, 4)
+    data = module.load_data(input_file)
+    return lambda: module.count_string(data, "XMAS")
+
+@benchmark("2024/05 middle_page_number_sum", 2024, 5, "05.txt")
+def bench_middle_page_number_sum(input_file):
+    module = solver_module(2024, 5)
+    ordering_rules, pages_to_print = module.load_data(input_file)
+    return lambda: module.middle_page_number_sum(ordering_rules, pages_to_print)
+
+@benchmark("2024/06 count_traps", 2024, 6, "06.txt")
+def bench_count_traps(input_file):
+    module = solver_module(2024, 6)
+    floor_map = module.load_data(input_file)
+    guard = module.get_guard(floor_map)
+    return lambda: module.count_traps(floor_map, guard)
+
+@benchmark("2024/07 Equations.calibration", 2024, 7, "07.txt")
+def bench_calibration(input_file):
+    module = solver_module(2024, 7)
+    equations = module.load_data(input_file)
+    return lambda: [eq.calibration(operators=["+", "*"]) for eq in equations]
+
+@benchmark("2024/07 Equations.calibration with concatenation", 2024, 7, "07.txt")
+def bench_calibration_with_concatenation(input_file):
+    module = solver_module(2024, 7)
+    equations = module.load_data(input_file)
+    return lambda: [eq.calibration(operators=["+", "*", "|"]) for eq in equations]
+
+@benchmark("2024/08 get_harmonic_antinodes", 2024, 8, "08.txt")
+def bench_get_harmonic_antinodes(input_file):
+    module = solver_module(2024, 8)
+    grid, grid_size = module.load_data(input_file)
+    return lambda: module.get_harmonic_antinodes(grid, grid_size)
+
+@benchmark("2023/01 DigitScanner.total", 2023, 1, "01.txt")
+def bench_digit_scanner(input_file):
+    module = solver_module(2023, 1)
+    return lambda: module.SCANNER.total(input_path(2023, file_name=input_file))
+
+@benchmark("2023/02 GameSession.valid_id_sums", 2023, 2, "02_input.txt")
+def bench_valid_id_sums(input_file):
+    module = solver_module(2023, 2)
+    session = module.GameSession(input_path(2023, file_name=input_file))
+    # a thousand different bags
+    bags = [module.Round(f"{red} red, {green} green, {blue} blue")
+            for red in range(10, 20) for green in range(10, 20) for blue in range(10, 20)]
+    return lambda: session.valid_id_sums(bags)
+
+@benchmark("2023/03 Schematic.gear_ratio", 2023, 3, "03_input.txt")
+def bench_schematic(input_file):
+    module = solver_module(2023, 3)
+    return lambda: module.Schematic(file_name=input_path(2023, file_name=input_file)).gear_ratio()
+
+@benchmark("2023/04 ScratchcardsPile.total_worth", 2023, 4, "04_input.txt")
+def bench_scratchcards_total_worth(input_file):
+    module = load_module(select(discover(), years=2023, days=4, parts=1)[0].path)
+    return lambda: module.ScratchcardsPile(input_path(2023, file_name=input_file)).total_worth()
+
+@benchmark("2023/04 ScratchcardsPile.total_cards", 2023, 4, "04_input.txt")
+def bench_scratchcards_total_cards(input_file):
+    module = solver_module(2023, 4)
+    return lambda: module.ScratchcardsPile(input_path(2023, file_name=input_file)).total_cards()
+
+
+### Import times ###
+
+IMPORT_MARKER = "advent.bench: importing the solver"
+
+# run in a fresh interpreter, the runner is imported before the marker so only the solver module is timed
+IMPORT_CODE = """
+import sys, time
+sys.path.insert(0, {root!r})
+from advent.runner import load_module
+sys.stderr.write({marker!r} + "\\n")
+start = time.perf_counter()
+load_module({path!r})
+print(time.perf_counter() - start)
+"""
+
+
+def import_name(solver):
+    return f"import {solver.year}/{solver.day:02d} {os.path.basename(solver.path)}"
+
+
+def import_time(path):
+    """
+    Import a solver module in a fresh interpreter.
+    Returns the seconds it took and the cumulative seconds of each module it imported directly.
+    """
+    code = IMPORT_CODE.format(root=ROOT, marker=IMPORT_MARKER, path=path)
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                             capture_output=True, text=True, cwd=ROOT, check=True)
+    imports = {}
+    for line in process.stderr.split(IMPORT_MARKER)[-1].splitlines():
+        # import time: self [us] | cumulative | imported package, indented by its nesting level
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        (_, cumulative, name) = line.split("|")
+        if cumulative.strip().isdigit() and not name[1:].startswith(" "):
+            imports[name.strip()] = int(cumulative) * 1e-6
+    return float(process.stdout.split()[-1]), imports
+
+
+def run_import_benchmarks(solvers, repeat=5):
+    """
+    Measure the import of each solver module, the Stats have the time of each sample
+    and the imports the cumulative time of the modules it imports in the last sample.
+    """
+    paths = sorted({solver.path: solver for solver in solvers}.items())
+    for (path, solver) in paths:
+        samples = []
+        for _ in range(repeat):
+            elapsed, imports = import_time(path)
+            samples.append(elapsed)
+        if len(samples) > 1:
+            q1, median, q3 = statistics.quantiles(samples, n=4)
+        else:
+            q1 = median = q3 = samples[0]
+        yield Stats(import_name(solver), median, q1, q3, samples, 1), imports
+
+
+### Measures ###
+
+def measure(name, func, repeat=5, warmup=1, min_time=0.05, scale=None):
+    """
+    Time func and return the Stats of the time per call.
+    """
+    # the first warm up call tells how many calls fit in a sample
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    number = max(1, math.ceil(min_time / elapsed)) if elapsed > 0 else 1000
+    for _ in range(warmup - 1):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+
+    if len(samples) > 1:
+        q1, median, q3 = statistics.quantiles(samples, n=4)
+    else:
+        q1 = median = q3 = samples[0]
+    return Stats(name, median, q1, q3, samples, number, scale)
+
+
+def run_benchmarks(names, repeat=5, warmup=1, min_time=0.05, scales=None, seed=0):
+    """
+    Run the benchmarks on the puzzle inputs, or on generated inputs of each of the scales.
+    """
+    # the solvers find their data relative to the root of the repository
+    os.chdir(ROOT)
+    for name in names:
+        (year, day, input_file, setup) = BENCHMARKS[name]
+        for scale in scales or [None]:
+            if scale is not None:
+                input_file = write_input(year, day, scale, seed)
+            label = name if scale is None else f"{name} @{scale}"
+            # the solvers print their progress, keep the report readable
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                func = setup(input_file)
+                stats = measure(label, func, repeat=repeat, warmup=warmup, min_time=min_time, scale=scale)
+            yield stats
+
+
+def load_baseline(file_name=BASELINE_FILE):
+    try:
+        with open(file_name, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(all_stats, file_name=BASELINE_FILE):
+    baseline = load_baseline(file_name)
+    for stats in all_stats:
+        baseline[stats.name] = {"median": stats.median, "q1": stats.q1, "q3": stats.q3}
+    os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    with open(file_name, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+
+def is_regression(stats, baseline, threshold):
+    """
+    A benchmark regresses when even its first quartile is slower than the baseline median
+    by more than the threshold, so a few noisy samples are not enough to fail.
+    """
+    reference = baseline.get(stats.name)
+    return reference is not None and stats.q1 > reference["median"] * (1 + threshold)
+
+
+def write_csv(all_stats, file_name):
+    with open(file_name, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "scale", "median", "q1", "q3"])
+        for stats in all_stats:
+            writer.writerow([stats.name, stats.scale, stats.median, stats.q1, stats.q3])
+
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def format_stats(stats, baseline):
+    res = f"{stats.name:<50} median {format_time(stats.median):>12}  IQR {format_time(stats.q3 - stats.q1):>12}  " \
+          f"({len(stats.samples)} x {stats.number})"
+    reference = baseline.get(stats.name)
+    if reference:
+        res += f"  {(stats.median / reference['median'] - 1) * 100:+.1f}% vs baseline"
+    return res
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m advent.bench", description="Benchmark the solver functions.")
+    parser.add_argument("--filter", default="", help="Only run the benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of samples")
+    parser.add_argument("--warmup", type=int, default=1, help="Number of calls before sampling")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum duration of a sample, in seconds")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Save the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Slowdown tolerated before failing, 0.1 is 10%%")
+    parser.add_argument("--scale", default=None, help="Comma separated scales of generated inputs, e.g. 1000,10000")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated inputs")
+    parser.add_argument("--csv", default=None, help="Write the timings to a CSV file")
+    parser.add_argument("--imports", action="store_true", help="Measure the import time of the solver modules")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    scales = None
+    if args.scale:
+        scales = [int(scale) for scale in args.scale.split(",")]
+        names = [name for name in names if BENCHMARKS[name][:2] in GENERATORS]
+    baseline = load_baseline(args.baseline)
+    all_stats = []
+    regressions = []
+    if args.imports:
+        solvers = [solver for solver in discover() if args.filter in import_name(solver)]
+        measures = run_import_benchmarks(solvers, repeat=args.repeat)
+    else:
+        measures = ((stats, None) for stats in run_benchmarks(names, repeat=args.repeat, warmup=args.warmup,
+                                                              min_time=args.min_time, scales=scales, seed=args.seed))
+    for (stats, imports) in measures:
+        print(format_stats(stats, baseline), flush=True)
+        if imports:
+            heaviest = sorted(imports.items(), key=lambda item: item[1], reverse=True)[:3]
+            print("    " + ", ".join(f"{name} {format_time(seconds)}" for (name, seconds) in heaviest))
+        all_stats.append(stats)
+        if is_regression(stats, baseline, args.threshold):
+            regressions.append(stats.name)
+
+    if args.save_baseline:
+        save_baseline(all_stats, args.baseline)
+    if args.csv:
+        write_csv(all_stats, args.csv)
+    for name in regressions:
+        print(f"REGRESSION {name}")
+    return 1 if regressions else 0
+
+
+### Unit tests ###
+
+class TestBench(unittest.TestCase):
+    def test_measure(self):
+        stats = measure("sum", lambda: sum(range(100)), repeat=3, min_time=0.001)
+        self.assertEqual(len(stats.samples), 3)
+        self.assertGreater(stats.number, 1)
+        self.assertLessEqual(stats.q1, stats.median)
+        self.assertLessEqual(stats.median, stats.q3)
+
+    def test_is_regression(self):
+        baseline = {"sum": {"median": 1.0, "q1": 0.9, "q3": 1.1}}
+        self.assertFalse(is_regression(Stats("sum", 1.2, 1.05, 1.3, [], 1), baseline, 0.1))
+        self.assertTrue(is_regression(Stats("sum", 1.3, 1.2, 1.4, [], 1), baseline, 0.1))
+        self.assertFalse(is_regression(Stats("new", 9.0, 9.0, 9.0, [], 1), baseline, 0.1))
+
+    def test_benchmark(self):
+        (stats,) = run_benchmarks(["2024/01 total_distance"], repeat=2, min_time=0.001)
+        self.assertGreater(stats.median, 0)
+
+    def test_import_time(self):
+        solver = select(discover(), years=2024, days=1, parts=1)[0]
+        elapsed, imports = import_time(solver.path)
+        self.assertGreater(elapsed, 0)
+        self.assertIn("inputs", imports)
+        self.assertNotIn("advent.runner", imports)
+        ((stats, _),) = run_import_benchmarks([solver, solver._replace(part=2)], repeat=2)
+        self.assertEqual(stats.name, "import 2024/01 d01_historian_hysteria.py")
+
+    def test_scales(self):
+        all_stats = list(run_benchmarks(["2024/01 similarity_score"], repeat=2, min_time=0.001, scales=[10, 100]))
+        self.assertEqual([stats.name for stats in all_stats],
+                         ["2024/01 similarity_score @10", "2024/01 similarity_score @100"])
+        self.assertLess(all_stats[0].median, all_stats[1].median)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "test":
+        # Run tests
+        unittest.main(argv=[sys.argv[0]])
+    else:
+        sys.exit(main())
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import os
+import random
+import string
+import sys
+import unittest
+
+from advent.registry import ROOT
+
+# Seeded generators of puzzle inputs of any size.
+#
+# The checked-in inputs are too small to show how a solver scales, these generators write inputs
+# in the same format as the puzzles with a configurable scale, always the same for a given seed.
+# The generated files go to <year>/data/synthetic/, where the solvers look for their inputs.
+#
+#   python -m advent.generators --year 2024 --day 6 --scale 2000
+#   python -m advent.generators --list
+
+# (year, day) -> (generator, meaning of the scale)
+GENERATORS = {}
+
+
+def generator(year, day, scale_unit):
+    def register(func):
+        GENERATORS[(year, day)] = (func, scale_unit)
+        return func
+    return register
+
+
+def generate(year, day, scale, seed=0):
+    """
+    Generate the text of an input of the given scale.
+    """
+    if (year, day) not in GENERATORS:
+        raise ValueError(f"No generator for {year} day {day}")
+    func, _ = GENERATORS[(year, day)]
+    return func(random.Random(seed), scale)
+
+
+def synthetic_file_name(day, scale, seed=0):
+    """
+    File name of a generated input, relative to the data directory of its year.
+    """
+    return f"synthetic/{day:02d}_{scale}_{seed}.txt"
+
+
+def write_input(year, day, scale, seed=0):
+    """
+    Write a generated input, unless it already exists, and return its file name relative to the data directory.
+    """
+    file_name = synthetic_file_name(day, scale, seed)
+    path = os.path.join(ROOT, str(year), "data", file_name)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(generate(year, day, scale, seed))
+    return file_name
+
+
+### 2024 ###
+
+@generator(2024, 1, "pairs of location IDs")
+def historian_hysteria(rng, scale):
+    # the right list reuses the left IDs, so the similarity score is not zero
+    left_list = [rng.randint(10000, 99999) for _ in range(scale)]
+    right_list = [rng.choice(left_list) if rng.random() < 0.3 else rng.randint(10000, 99999) for _ in range(scale)]
+    return "\n".join(f"{left}   {right}" for left, right in zip(left_list, right_list))
+
+
+@generator(2024, 2, "reports")
+def red_nosed_reports(rng, scale):
+    reports = []
+    for _ in range(scale):
+        level = rng.randint(1, 90)
+        direction = rng.choice((-1, 1))
+        report = [level]
+        for _ in range(rng.randint(4, 7)):
+            level += direction * rng.randint(1, 3)
+            report.append(level)
+        if rng.random() < 0.5:
+            # an unsafe level somewhere in the report
+            report[rng.randrange(len(report))] += rng.choice((-4, 0, 5))
+        reports.append(" ".join(str(level) for level in report))
+    return "\n".join(reports)
+
+
+@generator(2024, 3, "characters of corrupted memory")
+def mull_it_over(rng, scale):
+    noise = "!@#$%^&*()[]{}<>?,;:'+-~ whatfromselecthowwhowhere"
+    tokens = []
+    size = 0
+    while size < scale:
+        pick = rng.random()
+        if pick < 0.25:
+            token = f"mul({rng.randint(1, 999)},{rng.randint(1, 999)})"
+        elif pick < 0.3:
+            token = rng.choice(("do()", "don't()"))
+        elif pick < 0.35:
+            # almost an instruction
+            token = rng.choice(("mul[3,7]", "mul(32,64]", "mul ( 2 , 4 )", "mul(4*", "don't", "do("))
+        else:
+            token = "".join(rng.choice(noise) for _ in range(rng.randint(1, 8)))
+        tokens.append(token)
+        size += len(token)
+    data = "".join(tokens)
+    # a few long lines, like the puzzle input
+    return "\n".join(data[i:i + 3000] for i in range(0, len(data), 3000))
+
+
+@generator(2024, 4, "side of the grid")
+def ceres_search(rng, scale):
+    return "\n".join("".join(rng.choice("XMAS") for _ in range(scale)) for _ in range(scale))
+
+
+@generator(2024, 5, "updates")
+def print_queue(rng, scale, pages=49):
+    # there is a rule for every pair of pages, like the puzzle input, so every update has a single valid order
+    order = rng.sample(range(10, 10 + max(pages, 90)), pages)
+    rules = [f"{order[i]}|{order[j]}" for i in range(pages) for j in range(i + 1, pages)]
+    rng.shuffle(rules)
+    rank = {page: i for i, page in enumerate(order)}
+    updates = []
+    for _ in range(scale):
+        update = rng.sample(order, rng.randrange(5, min(24, pages + 1), 2))
+        if rng.random() < 0.5:
+            update.sort(key=rank.get)
+        updates.append(",".join(str(page) for page in update))
+    return "\n".join(rules) + "\n\n" + "\n".join(updates)
+
+
+@generator(2024, 6, "side of the floor map")
+def guard_gallivant(rng, scale, density=0.05):
+    floor_map = [["#" if rng.random() < density else "." for _ in range(scale)] for _ in range(scale)]
+    row, col = scale // 2, scale // 2
+    floor_map[row][col] = "^"
+    # the guard must leave the map in the first part: remove the obstacles closing a loop until it does
+    directions = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+    while True:
+        (r, c), d = (row, col), 0
+        seen = set()
+        while 0 <= r < scale and 0 <= c < scale and (r, c, d) not in seen:
+            seen.add((r, c, d))
+            next_r, next_c = r + directions[d][0], c + directions[d][1]
+            if 0 <= next_r < scale and 0 <= next_c < scale and floor_map[next_r][next_c] == "#":
+                last_obstacle = (next_r, next_c)
+                d = (d + 1) % 4
+            else:
+                r, c = next_r, next_c
+        if not (0 <= r < scale and 0 <= c < scale):
+            break
+        floor_map[last_obstacle[0]][last_obstacle[1]] = "."
+    return "\n".join("".join(line) for line in floor_map)
+
+
+@generator(2024, 7, "equations")
+def bridge_repair(rng, scale, max_operands=12):
+    equations = []
+    for _ in range(scale):
+        operands = [rng.randint(1, 999) if rng.random() < 0.5 else rng.randint(1, 9)
+                    for _ in range(rng.randint(3, max_operands))]
+        result = operands[0]
+        for operand in operands[1:]:
+            op = rng.choice("+*|")
+            result = result + operand if op == "+" else result * operand if op == "*" else int(f"{result}{operand}")
+        if rng.random() < 0.3:
+            # most likely without solution
+            result += rng.randint(1, 99)
+        equations.append(f"{result}: {' '.join(str(operand) for operand in operands)}")
+    return "\n".join(equations)
+
+
+@generator(2024, 8, "side of the antenna map")
+def resonant_collinearity(rng, scale, density=0.08):
+    frequencies = string.digits + string.ascii_letters
+    return "\n".join("".join(rng.choice(frequencies) if rng.random() < density else "." for _ in range(scale))
+                     for _ in range(scale))
+
+
+### 2023 ###
+
+DIGIT_WORDS = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
+
+
+@generator(2023, 1, "lines of calibration document")
+def trebuchet(rng, scale):
+    lines = []
+    for _ in range(scale):
+        tokens = [str(rng.randint(1, 9))]
+        for _ in range(rng.randint(2, 8)):
+            pick = rng.random()
+            if pick < 0.3:
+                tokens.append(rng.choice(DIGIT_WORDS))
+            elif pick < 0.5:
+                tokens.append(str(rng.randint(1, 9)))
+            else:
+                tokens.append("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(1, 5))))
+        rng.shuffle(tokens)
+        lines.append("".join(tokens))
+    return "\n".join(lines)
+
+
+@generator(2023, 2, "games")
+def cube_conundrum(rng, scale):
+    games = []
+    for game_id in range(1, scale + 1):
+        rounds = []
+        for _ in range(rng.randint(1, 6)):
+            colors = rng.sample(["red", "green", "blue"], rng.randint(1, 3))
+            rounds.append(", ".join(f"{rng.randint(1, 20)} {color}" for color in colors))
+        games.append(f"Game {game_id}: " + "; ".join(rounds))
+    return "\n".join(games)
+
+
+@generator(2023, 3, "side of the schematic")
+def gear_ratios(rng, scale):
+    symbols = "*#$+/-%&@="
+    schematic = [["."] * scale for _ in range(scale)]
+    for row in range(scale):
+        col = 0
+        while col < scale:
+            pick = rng.random()
+            if pick < 0.12:
+                number = str(rng.randint(1, 999))[:scale - col]
+                schematic[row][col:col + len(number)] = number
+                col += len(number) + 1
+            elif pick < 0.16:
+                schematic[row][col] = "*" if rng.random() < 0.5 else rng.choice(symbols)
+                col += 2
+            else:
+                col += 1
+    return "\n".join("".join(line) for line in schematic)
+
+
+@generator(2023, 4, "scratchcards")
+def scratchcards(rng, scale):
+    cards = []
+    for card_id in range(1, scale + 1):
+        winning_numbers = rng.sample(range(1, 100), 10)
+        matches = rng.sample(winning_numbers, min(10, int(rng.expovariate(0.5))))
+        numbers = matches + rng.sample([n for n in range(1, 100) if n not in winning_numbers], 25 - len(matches))
+        rng.shuffle(numbers)
+        cards.append(f"Card {card_id:>3}: {' '.join(f'{n:>2}' for n in winning_numbers)} | "
+                     f"{' '.join(f'{n:>2}' for n in numbers)}")
+    return "\n".join(cards)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m advent.generators", description="Generate puzzle inputs.")
+    parser.add_argument("--list", action="store_true", help="List the generators and the meaning of their scale")
+    parser.add_argument("--year", type=int)
+    parser.add_argument("--day", type=int)
+    parser.add_argument("--scale", type=int, help="Size of the input, see --list for its meaning")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    if args.list:
+        for (year, day), (_, scale_unit) in sorted(GENERATORS.items()):
+            print(f"{year} day {day:02d}: scale in {scale_unit}")
+        return
+    if args.year is None or args.day is None or args.scale is None:
+        parser.error("--year, --day and --scale are required to generate an input")
+    print(os.path.join(str(args.year), "data", write_input(args.year, args.day, args.scale, args.seed)))
+
+
+### Unit tests ###
+
+class TestGenerators(unittest.TestCase):
+    def test_seeded(self):
+        for (year, day) in GENERATORS:
+            text = generate(year, day, 20, seed=1)
+            self.assertEqual(text, generate(year, day, 20, seed=1))
+            self.assertFalse(text.endswith("\n"))
+
+    def test_guard_leaves_the_map(self):
+        for seed in range(5):
+            floor_map = generate(2024, 6, 60, seed=seed).splitlines()
+            self.assertEqual(len(floor_map), 60)
+            self.assertEqual(sum(line.count("^") for line in floor_map), 1)
+            # walk the guard until it leaves the map, a loop would revisit a cell in the same direction
+            row = next(i for i, line in enumerate(floor_map) if "^" in line)
+            (row, col), (d_row, d_col) = (row, floor_map[row].index("^")), (-1, 0)
+            seen = set()
+            while 0 <= row < 60 and 0 <= col < 60:
+                self.assertNotIn((row, col, d_row, d_col), seen)
+                seen.add((row, col, d_row, d_col))
+                if 0 <= row + d_row < 60 and 0 <= col + d_col < 60 and floor_map[row + d_row][col + d_col] == "#":
+                    (d_row, d_col) = (d_col, -d_row)
+                else:
+                    (row, col) = (row + d_row, col + d_col)
+
+    def test_print_queue_rules(self):
+        rules, updates = generate(2024, 5, 10).split("\n\n")
+        self.assertEqual(len(rules.splitlines()), 49 * 48 // 2)
+        self.assertEqual(len(updates.splitlines()), 10)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "test":
+        # Run tests
+        unittest.main(argv=[sys.argv[0]])
+    else:
+        main()
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import mmap
+import os
+import sys
+import unittest
+from array import array
+
+# Input layer shared by the solvers of every year.
+#
+# An input is found from its year, day and variant (the puzzle input or the test cases) or from its
+# file name, always relative to the data directory of its year in this repository, whatever the
+# current directory. The file is memory mapped and read through bytes lines or memoryviews,
+# so a large input is never held at the same time as a str, a list of lines and the parsed data.
+#
+# The parsed form of an input can be kept on disk, packed in arrays, so the next runs on the same
+# input read the arrays instead of parsing the text again. See load_parsed.
+#
+# This module only uses the standard library and never imports the advent package, the src directory of
+# each year links to it as inputs.py, so the solvers import it as the top-level module inputs.
+
+# the real path, this file is also imported through the links of the year directories
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+# parsed inputs, evicted least recently used first past PARSED_CACHE_SIZE bytes
+PARSED_DIR = os.path.join(ROOT, ".advent", "parsed")
+PARSED_CACHE_SIZE = 256 * 2**20
+PACKED_MAGIC = b"ADVENT-PACKED-1\n"
+
+PUZZLE = None
+TEST = "test"
+
+# year -> variant -> candidate file names, the first one found is used
+LAYOUTS = {
+    2021: {PUZZLE: ["{day}"]},
+    2023: {PUZZLE: ["{day:02d}_input.txt", "{day:02d}.txt"], TEST: ["{day:02d}_test_cases.txt"]},
+    2024: {PUZZLE: ["{day:02d}.txt"], TEST: ["test_{day:02d}.txt"]},
+}
+
+
+def data_dir(year):
+    return os.path.join(ROOT, str(year), "data")
+
+
+def input_path(year, day=None, variant=PUZZLE, file_name=None):
+    """
+    Path of an input, given by its file name in the data directory of the year, or by its day and variant.
+    """
+    if file_name is not None:
+        candidates = [file_name]
+    else:
+        candidates = [pattern.format(day=day) for pattern in LAYOUTS.get(year, {}).get(variant, [])]
+    for candidate in candidates:
+        path = os.path.join(data_dir(year), candidate)
+        if os.path.exists(path):
+            return path
+    name = file_name if file_name is not None else f"day {day}" + (f" ({variant})" if variant else "")
+    raise FileNotFoundError(f"Input file not found: {year} {name}")
+
+
+class Input():
+    """
+    A memory mapped input file, to use in a with block.
+    The views and lines it returns are only valid until the file is closed.
+    """
+    __slots__ = ('path', '_file', '_map')
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        # an empty file cannot be mapped
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._map = b""
+        else:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._map)
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            try:
+                self._map.close()
+            except BufferError:
+                # a view is still alive, the map is closed when it is garbage collected
+                pass
+        self._file.close()
+
+    @property
+    def data(self):
+        """
+        The whole file, as a read-only memoryview.
+        """
+        return memoryview(self._map)
+
+    def _spans(self):
+        data = self._map
+        start = 0
+        while start < len(data):
+            end = data.find(b"\n", start)
+            if end < 0:
+                end = len(data)
+            yield start, end - 1 if end > start and data[end - 1] == 13 else end
+            start = end + 1
+
+    def lines(self):
+        """
+        The lines as bytes without their line break, like splitlines, copied one line at a time.
+        """
+        data = self._map
+        for start, end in self._spans():
+            yield data[start:end]
+
+    def views(self):
+        """
+        The lines as memoryviews of the map, without copy.
+        """
+        data = memoryview(self._map)
+        for start, end in self._spans():
+            yield data[start:end]
+
+    def chunks(self, chunk_size):
+        """
+        The file as bytes of chunk_size, the last one can be shorter.
+        """
+        data = self._map
+        for i in range(0, len(data), chunk_size):
+            yield data[i:i + chunk_size]
+
+    def text(self):
+        return bytes(self._map).decode()
+
+
+def open_input(year, day=None, variant=PUZZLE, file_name=None):
+    return Input(input_path(year, day, variant, file_name))
+
+
+def read_lines(year, day=None, variant=PUZZLE, file_name=None):
+    """
+    Lines of an input as bytes, the file is closed once they are read.
+    """
+    with open_input(year, day, variant, file_name) as data:
+        yield from data.lines()
+
+
+### Parsed inputs ###
+
+def write_packed(path, fields):
+    """
+    Write a dict of arrays (or bytes) to a file: a JSON header describing the fields, then their raw bytes.
+    The file is written next to its final path and renamed, so a reader never sees half a file.
+    """
+    header = [[name, value.typecode if isinstance(value, array) else "", len(value) * getattr(value, "itemsize", 1)]
+              for name, value in fields.items()]
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(PACKED_MAGIC)
+            f.write(json.dumps(header).encode() + b"\n")
+            for value in fields.values():
+                f.write(value)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_packed(path):
+    """
+    Read the dict of arrays written by write_packed, raise ValueError if the file is not a packed file.
+    """
+    with open(path, 'rb') as f:
+        if f.readline() != PACKED_MAGIC:
+            raise ValueError(f"Not a packed file: {path}")
+        header = json.loads(f.readline())
+        fields = {}
+        for name, typecode, size in header:
+            data = f.read(size)
+            if len(data) != size:
+                raise ValueError(f"Truncated packed file: {path}")
+            if typecode:
+                fields[name] = array(typecode)
+                fields[name].frombytes(data)
+            else:
+                fields[name] = data
+    return fields
+
+
+def evict_parsed(max_size=None, directory=None):
+    """
+    Delete the least recently used parsed inputs until the cache fits in max_size bytes.
+    """
+    max_size = PARSED_CACHE_SIZE if max_size is None else max_size
+    directory = directory or PARSED_DIR
+    entries = []
+    for name in os.listdir(directory):
+        # the files being written by other processes are not part of the cache yet
+        if name.endswith(".tmp"):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            # evicted or replaced by another process meanwhile
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for (_, size, _) in entries)
+    for (_, size, path) in sorted(entries):
+        if total <= max_size:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def load_parsed(path, parse, name, version, pack, unpack, directory=None):
+    """
+    Parse an input, or read its parsed form from the disk cache.
+
+    Args:
+        path: the input file
+        parse: function parsing the mapped Input
+        name: name of the parser, e.g. "2024-07"
+        version: version of the parser and of its packed format, changed when they change
+        pack: function turning the parsed data into a dict of arrays or bytes, it can raise
+              OverflowError or TypeError when the data does not fit, the data is then not cached
+        unpack: function turning the dict back into the parsed data
+
+    The cached files are keyed by the name, the version and the SHA-256 of the input, so they are
+    never used for another input or by another version of the parser: the stale files are never
+    read again and are evicted with the least recently used ones.
+    """
+    directory = directory or PARSED_DIR
+    with Input(path) as content:
+        digest = hashlib.sha256(content.data).hexdigest()
+        cache_path = os.path.join(directory, f"{name}-v{version}-{digest}.bin")
+        try:
+            res = unpack(read_packed(cache_path))
+            # the modification time orders the eviction
+            os.utime(cache_path)
+            return res
+        except (OSError, ValueError):
+            pass
+        res = parse(content)
+
+    try:
+        fields = pack(res)
+    except (OverflowError, TypeError):
+        return res
+    # the cache is only an optimization, failing to write it never fails the solver
+    try:
+        os.makedirs(directory, exist_ok=True)
+        write_packed(cache_path, fields)
+        evict_parsed(directory=directory)
+    except OSError:
+        pass
+    return res
+
+
+### Unit tests ###
+
+class TestInputs(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up test files for unit tests.
+        """
+        import tempfile
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, content):
+        path = os.path.join(self.tmp_dir.name, "input.txt")
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_input_path(self):
+        self.assertEqual(input_path(2024, 5), os.path.join(ROOT, "2024", "data", "05.txt"))
+        self.assertEqual(input_path(2024, 5, TEST), os.path.join(ROOT, "2024", "data", "test_05.txt"))
+        self.assertEqual(input_path(2023, 4), os.path.join(ROOT, "2023", "data", "04_input.txt"))
+        self.assertEqual(input_path(2021, 1), os.path.join(ROOT, "2021", "data", "1"))
+        self.assertEqual(input_path(2024, file_name="test_08_T.txt"), os.path.join(ROOT, "2024", "data", "test_08_T.txt"))
+        with self.assertRaises(FileNotFoundError):
+            input_path(2024, 26)
+        with self.assertRaises(FileNotFoundError):
+            input_path(1999, 1)
+
+    def test_lines(self):
+        for content in (b"ab\ncd\r\n\nef", b"ab\ncd\r\n\nef\n"):
+            with Input(self.write(content)) as data:
+                self.assertEqual(list(data.lines()), content.splitlines())
+                self.assertEqual([view.tobytes() for view in data.views()], content.splitlines())
+                self.assertEqual(data.text(), content.decode())
+                self.assertEqual(b"".join(data.chunks(3)), content)
+
+    def test_empty(self):
+        with Input(self.write(b"")) as data:
+            self.assertEqual(len(data), 0)
+            self.assertEqual(list(data.lines()), [])
+
+    def test_load_parsed(self):
+        path = self.write(b"1 2\n3 4")
+        directory = os.path.join(self.tmp_dir.name, "parsed")
+        calls = []
+
+        def parse(content):
+            calls.append(1)
+            return [[int(x) for x in line.split()] for line in content.lines()]
+
+        def pack(rows):
+            return {"values": array('q', [x for row in rows for x in row]), "width": array('q', [len(rows[0])])}
+
+        def unpack(fields):
+            values, width = fields["values"], fields["width"][0]
+            return [list(values[i:i + width]) for i in range(0, len(values), width)]
+
+        for version in (1, 1, 2):
+            self.assertEqual(load_parsed(path, parse, "test", version, pack, unpack, directory), [[1, 2], [3, 4]])
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(os.listdir(directory)), 2)
+
+        # a new content is parsed again
+        path = self.write(b"5 6")
+        self.assertEqual(load_parsed(path, parse, "test", 2, pack, unpack, directory), [[5, 6]])
+        self.assertEqual(len(calls), 3)
+
+        # the data that does not fit the arrays is not cached
+        path = self.write(b"1 99999999999999999999")
+        self.assertEqual(load_parsed(path, parse, "test", 2, pack, unpack, directory), [[1, 99999999999999999999]])
+        self.assertEqual(len(os.listdir(directory)), 3)
+
+        # the files written by other processes are left alone
+        with open(os.path.join(directory, "test-v2-0.bin.123.tmp"), 'wb') as f:
+            f.write(b"partial")
+        evict_parsed(0, directory)
+        self.assertEqual(os.listdir(directory), ["test-v2-0.bin.123.tmp"])
+
+        # a cache that cannot be written does not fail the parsing
+        path = self.write(b"7 8")
+        self.assertEqual(load_parsed(path, parse, "test", 2, pack, unpack, os.path.join(path, "parsed")), [[7, 8]])
+
+    def test_working_directory(self):
+        cwd = os.getcwd()
+        try:
+            os.chdir(self.tmp_dir.name)
+            self.assertEqual(next(read_lines(2024, 1)), next(read_lines(2024, file_name="01.txt")))
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "test":
+        # Run tests
+        unittest.main(argv=[sys.argv[0]])
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import cProfile
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from collections import Counter
+
+from advent.registry import STATE_DIR, SCRIPT, Solver, discover, select
+from advent.runner import execute
+
+# Profiles of the solvers, written by python -m advent --profile.
+#
+# A profiled solver runs in its own worker process like any other, with a profiler around it:
+#   cprofile  deterministic, every call is counted, the stacks are rebuilt from the callers of each function
+#   sample    the stack of the solver is sampled every `interval` seconds, the stacks are exact
+# Each profile is written as collapsed stacks, one "root;caller;function value" line per stack, the format
+# read by flamegraph.pl, speedscope or inferno, and as a summary of the top functions.
+# The code of the solvers in pools of processes is not profiled, only the process of the runner worker.
+# The normal runs never import this module.
+
+PROFILE_DIR = os.path.join(STATE_DIR, "profiles")
+
+CPROFILE = "cprofile"
+SAMPLE = "sample"
+MODES = [CPROFILE, SAMPLE]
+
+
+def frame_label(file_name, line, name):
+    return f"{name} ({os.path.basename(file_name)}:{line})"
+
+
+def profile_path(solver, mode, extension, directory=None):
+    name = f"{solver.year}-{solver.day:02d}-p{solver.part}-{mode}.{extension}"
+    return os.path.join(directory or PROFILE_DIR, name)
+
+
+### Sampling ###
+
+class Sampler():
+    """
+    Sample the stack of a thread from another thread, to use in a with block around the code to profile.
+    With a root code object, the stacks start at the frame running it and the samples taken
+    outside of it are dropped, so the frames of the worker process do not clutter the profile.
+    """
+    def __init__(self, interval=0.001, thread_id=None, root=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.root = root
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._switch_interval = None
+
+    def __enter__(self):
+        # the sampler only gets the GIL back at each switch interval, sample at least as often
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(frame_label(code.co_filename, code.co_firstlineno, code.co_name))
+                if code is self.root:
+                    break
+                frame = frame.f_back
+            if stack and (self.root is None or frame is not None):
+                self.stacks[tuple(reversed(stack))] += 1
+
+
+def top_samples(stacks, top=20):
+    """
+    The functions with the most samples, as (self share, total share, function), the total share
+    counts the samples where the function is anywhere on the stack.
+    """
+    count = sum(stacks.values())
+    if count == 0:
+        # the solver ran between two samples
+        return []
+    own = Counter()
+    total = Counter()
+    for stack, samples in stacks.items():
+        own[stack[-1]] += samples
+        for function in set(stack):
+            total[function] += samples
+    ranked = sorted(total, key=lambda function: (own[function], total[function]), reverse=True)
+    return [(own[function] / count, total[function] / count, function) for function in ranked[:top]]
+
+
+### Deterministic profiles ###
+
+def collapse_stats(stats, max_depth=64):
+    """
+    Collapsed stacks of a cProfile run, in microseconds of own time.
+    cProfile only knows the callers of each function, so the time of a function called from several
+    places is split between its callers in proportion of the time it spent for each of them.
+    """
+    children = {}
+    for function, (_, _, _, _, callers) in stats.items():
+        for caller, (_, _, _, cumulative) in callers.items():
+            children.setdefault(caller, []).append((function, cumulative))
+    roots = [function for function, (_, _, _, _, callers) in stats.items() if not callers]
+
+    stacks = Counter()
+
+    def visit(function, path, time_in_context):
+        (_, _, own, cumulative, _) = stats[function]
+        share = time_in_context / cumulative if cumulative > 0 else 0.0
+        path = path + (frame_label(*function),)
+        stacks[path] += own * share * 1e6
+        if len(path) >= max_depth:
+            return
+        for child, edge_time in children.get(function, []):
+            # the recursive calls are already counted in the time of the outer call
+            if frame_label(*child) not in path and edge_time * share > 1e-6:
+                visit(child, path, edge_time * share)
+
+    for root in roots:
+        visit(root, (), stats[root][3])
+    return Counter({stack: round(value) for stack, value in stacks.items() if round(value) > 0})
+
+
+def top_functions(stats, top=20):
+    """
+    The functions with the most own time, as (own seconds, cumulative seconds, calls, function).
+    """
+    rows = [(own, cumulative, calls, frame_label(*function))
+            for function, (_, calls, own, cumulative, _) in stats.items()]
+    return sorted(rows, reverse=True)[:top]
+
+
+### Output ###
+
+def write_collapsed(stacks, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        for stack, value in sorted(stacks.items()):
+            f.write(";".join(stack) + f" {value}\n")
+
+
+def format_summary(solver, mode, rows):
+    lines = [f"{solver.year} day {solver.day:02d} part {solver.part}, {mode} profile"]
+    if mode == SAMPLE:
+        lines.append(f"{'self':>7} {'total':>7}  function")
+        lines += [f"{own:7.1%} {total:7.1%}  {function}" for (own, total, function) in rows]
+    else:
+        lines.append(f"{'own s':>9} {'cum s':>9} {'calls':>9}  function")
+        lines += [f"{own:9.4f} {cumulative:9.4f} {calls:9d}  {function}" for (own, cumulative, calls, function) in rows]
+    return "\n".join(lines)
+
+
+def profile_solver(solver, mode=CPROFILE, interval=0.001, top=20, directory=None):
+    """
+    Run a solver under a profiler, write its collapsed stacks and its summary, and return its Result.
+    """
+    if mode == SAMPLE:
+        with Sampler(interval, root=execute.__code__) as sampler:
+            result = execute(solver)
+        stacks = sampler.stacks
+        rows = top_samples(stacks, top)
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            result = execute(solver)
+        finally:
+            profiler.disable()
+        stats = pstats.Stats(profiler)
+        os.makedirs(directory or PROFILE_DIR, exist_ok=True)
+        # for the tools reading pstats files, e.g. snakeviz
+        stats.dump_stats(profile_path(solver, mode, "pstats", directory))
+        stacks = collapse_stats(stats.stats)
+        rows = top_functions(stats.stats, top)
+    write_collapsed(stacks, profile_path(solver, mode, "collapsed", directory))
+    with open(profile_path(solver, mode, "txt", directory), "w") as f:
+        f.write(format_summary(solver, mode, rows) + "\n")
+    return result
+
+
+def read_summary(solver, mode, directory=None):
+    try:
+        with open(profile_path(solver, mode, "txt", directory)) as f:
+            return f.read().rstrip("\n")
+    except FileNotFoundError:
+        return None
+
+
+### Unit tests ###
+
+def _fibonacci(n):
+    return n if n < 2 else _fibonacci(n - 1) + _fibonacci(n - 2)
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        _fibonacci(10)
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a profile directory for unit tests.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_sampler(self):
+        with Sampler(0.001) as sampler:
+            _busy(0.2)
+        self.assertGreater(sum(sampler.stacks.values()), 10)
+        (own, total, function) = top_samples(sampler.stacks, top=1)[0]
+        self.assertTrue(function.startswith("_fibonacci"))
+        self.assertGreaterEqual(total, own)
+
+        with Sampler(0.001, root=_busy.__code__) as sampler:
+            _busy(0.1)
+        self.assertTrue(all(stack[0].startswith("_busy") for stack in sampler.stacks))
+        self.assertEqual(top_samples(Counter()), [])
+
+    def test_collapse_stats(self):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        _busy(0.05)
+        profiler.disable()
+        stats = pstats.Stats(profiler).stats
+        stacks = collapse_stats(stats)
+        # the recursion is folded in the outer call
+        fibonacci = [stack for stack in stacks if stack[-1].startswith("_fibonacci")]
+        self.assertTrue(fibonacci)
+        self.assertTrue(all(stack[-2].startswith("_busy") for stack in fibonacci))
+        # the stacks account for the time of the profiled code
+        (_, _, _, busy_time, _) = next(value for function, value in stats.items() if function[2] == "_busy")
+        busy_stacks = sum(value for stack, value in stacks.items() if any(frame.startswith("_busy") for frame in stack))
+        self.assertAlmostEqual(busy_stacks * 1e-6, busy_time, delta=busy_time * 0.05 + 1e-3)
+
+    def test_profile_solver(self):
+        solver = select(discover(), years=2024, days=1, parts=1)[0]
+        for mode in MODES:
+            result = profile_solver(solver, mode, top=5, directory=self.tmp_dir.name)
+            self.assertEqual(result.answer, 2756096)
+            with open(profile_path(solver, mode, "collapsed", self.tmp_dir.name)) as f:
+                for line in f:
+                    stack, value = line.rsplit(" ", 1)
+                    self.assertTrue(stack)
+                    self.assertGreater(int(value), 0)
+            self.assertIn("part 1", read_summary(solver, mode, self.tmp_dir.name))
+
+    def test_error(self):
+        solver = Solver(2024, 1, 1, os.path.join(self.tmp_dir.name, "missing.py"), SCRIPT)
+        result = profile_solver(solver, CPROFILE, directory=self.tmp_dir.name)
+        self.assertIn("missing.py", result.error)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "test":
+        # Run tests
+        unittest.main(argv=[sys.argv[0]])
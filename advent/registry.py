@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import unittest
+from collections import namedtuple
+
+# Discovery of the solvers of every year.
+#
+# Each year keeps its own layout:
+#   2021/src/<number>.py     solve(input) for the first part, input read by loader.py
+#   2023/src/dNNpP_<name>.py a module per part, solve(part, data) with data read by load_data(input path)
+#   2024/src/dNN_<name>.py   solve(part, data) with data read by load_data("NN.txt")
+#
+# The solvers are found from their file names only, no solver module is imported before it runs,
+# so listing them or starting a single one does not pay for importing the others.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# timings, baselines and caches written by the runner, not versioned
+STATE_DIR = os.path.join(ROOT, ".advent")
+
+# kind of solver, it tells the runner how to call it
+LEVEL = "level"
+SCRIPT = "script"
+MODULE = "module"
+
+NUMBERS = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+           "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen", "seventeen",
+           "eighteen", "nineteen", "twenty", "twentyone", "twentytwo", "twentythree",
+           "twentyfour", "twentyfive"]
+
+SCRIPT_NAME = re.compile(r"^d(\d\d)p(\d)[._].*\.py$")
+MODULE_NAME = re.compile(r"^d(\d\d)_.*\.py$")
+
+Solver = namedtuple("Solver", ["year", "day", "part", "path", "kind"])
+
+
+def solver_name(solver):
+    return f"{solver.year} day {solver.day:02d} part {solver.part}"
+
+
+def discover(root=ROOT):
+    """
+    Find the solvers of every year directory, sorted by year, day and part.
+    """
+    solvers = []
+    for year in sorted(os.listdir(root)):
+        src = os.path.join(root, year, "src")
+        if not year.isdigit() or not os.path.isdir(src):
+            continue
+        for file_name in sorted(os.listdir(src)):
+            path = os.path.join(src, file_name)
+            match = SCRIPT_NAME.match(file_name)
+            if match:
+                solvers.append(Solver(int(year), int(match.group(1)), int(match.group(2)), path, SCRIPT))
+                continue
+            match = MODULE_NAME.match(file_name)
+            if match:
+                for part in (1, 2):
+                    solvers.append(Solver(int(year), int(match.group(1)), part, path, MODULE))
+                continue
+            name = file_name[:-3]
+            if file_name.endswith(".py") and name in NUMBERS:
+                solvers.append(Solver(int(year), NUMBERS.index(name) + 1, 1, path, LEVEL))
+    return sorted(solvers)
+
+
+def parse_range(value):
+    """
+    Parse a selection such as "6", "1-5" or "1-3,8" into a set of integers.
+    None selects everything.
+    """
+    if value is None:
+        return None
+    res = set()
+    for item in str(value).split(","):
+        item = item.strip()
+        if "-" in item:
+            first, last = item.split("-", 1)
+            res.update(range(int(first), int(last) + 1))
+        elif item:
+            res.add(int(item))
+    return res
+
+
+def select(solvers, years=None, days=None, parts=None):
+    years, days, parts = parse_range(years), parse_range(days), parse_range(parts)
+    return [solver for solver in solvers
+            if (years is None or solver.year in years)
+            and (days is None or solver.day in days)
+            and (parts is None or solver.part in parts)]
+
+
+### Unit tests ###
+
+class TestRegistry(unittest.TestCase):
+    def test_parse_range(self):
+        self.assertEqual(parse_range("6"), {6})
+        self.assertEqual(parse_range("1-3,8"), {1, 2, 3, 8})
+        self.assertIsNone(parse_range(None))
+
+    def test_discover(self):
+        solvers = discover()
+        self.assertIn((2021, 1, 1), [solver[:3] for solver in solvers])
+        self.assertIn((2023, 4, 2), [solver[:3] for solver in solvers])
+        self.assertIn((2024, 6, 2), [solver[:3] for solver in solvers])
+        selected = select(solvers, years="2024", days="6-7", parts="2")
+        self.assertEqual([solver[:3] for solver in selected], [(2024, 6, 2), (2024, 7, 2)])
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "test":
+        # Run tests
+        unittest.main(argv=[sys.argv[0]])
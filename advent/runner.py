@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import contextlib
+import importlib
+import importlib.util
+import io
+import multiprocessing as mp
+import os
+import resource
+import sys
+import time
+import unittest
+from collections import namedtuple
+
+from advent.inputs import input_path
+from advent.registry import ROOT, LEVEL, SCRIPT, Solver, discover, select, solver_name
+
+# Run the solvers and measure them.
+# Every solver runs in a fresh process, so the peak RSS of a part is not hidden by the parts
+# that ran before it, and modules of different years with the same name (loader, grid...) never clash.
+
+# cached: the answer comes from a previous run, with its timing, see advent.answers
+Result = namedtuple("Result", ["solver", "answer", "wall", "cpu", "max_rss", "error", "cached"], defaults=[False])
+
+
+def add_to_path(path):
+    """
+    Add the directory of a solver to the python path for its own imports (grid, loader, parse_cache...).
+    """
+    src = os.path.dirname(path)
+    # appended, so the year directories never shadow this package (2021/src/advent.py)
+    if src not in sys.path:
+        sys.path.append(src)
+
+
+def load_module(path):
+    """
+    Import a solver module from its path.
+    """
+    add_to_path(path)
+    # some 2023 file names have a dot, e.g. d04p2.scratchcards.py
+    name = os.path.basename(path)[:-3].replace(".", "_")
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
+    return sys.modules[name]
+
+
+def call_solver(solver):
+    """
+    Run a solver in the current process and return its answer.
+    The solvers print their progress, so the standard output is captured.
+    """
+    # the solvers find their data relative to the root of the repository
+    os.chdir(ROOT)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        module = load_module(solver.path)
+        if solver.kind == SCRIPT:
+            if hasattr(module, "solve"):
+                # one module per part, e.g. the 2023 ones, the path of the input is its file name in the data directory
+                return module.solve(solver.part, module.load_data(input_path(solver.year, solver.day)))
+            # a script without solve function solved the puzzle when it was imported
+            lines = [line.strip() for line in output.getvalue().splitlines() if line.strip()]
+            return lines[-1] if lines else None
+        if solver.kind == LEVEL:
+            loader = importlib.import_module("loader")
+            return module.solve(loader.load_level_input(solver.day))
+        return module.solve(solver.part, module.load_data(f"{solver.day:02d}.txt"))
+
+
+def cpu_time():
+    """
+    User and system time of this process and of the processes it waited for.
+    """
+    res = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        res += usage.ru_utime + usage.ru_stime
+    return res
+
+
+def peak_rss():
+    """
+    Peak resident set size in bytes.
+    """
+    max_rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def execute(solver):
+    start_wall = time.perf_counter()
+    start_cpu = cpu_time()
+    answer = error = None
+    try:
+        answer = call_solver(solver)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - start_wall
+    cpu = cpu_time() - start_cpu
+    return Result(solver, answer, wall, cpu, peak_rss(), error)
+
+
+def _worker(solver, connection, memory_limit, func):
+    if memory_limit:
+        # the solver gets a MemoryError instead of pushing the machine into swap
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    connection.send(func(solver))
+    connection.close()
+
+
+def start_worker(solver, memory_limit=None, func=None):
+    """
+    Start a fresh process running the solver.
+    func replaces execute to run it differently, e.g. under a profiler, it must return a Result.
+    Returns the process and the connection its Result is received from.
+    """
+    context = mp.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_worker, args=(solver, sender, memory_limit, func or execute))
+    process.start()
+    sender.close()
+    return process, receiver
+
+
+def receive_result(solver, process, receiver):
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = None
+    receiver.close()
+    process.join()
+    if result is None:
+        result = Result(solver, None, 0.0, 0.0, 0, f"worker exited with code {process.exitcode}")
+    return result
+
+
+def run_isolated(solver, memory_limit=None):
+    """
+    Run a solver in a fresh process and return its Result.
+    """
+    process, receiver = start_worker(solver, memory_limit)
+    return receive_result(solver, process, receiver)
+
+
+def run(solvers, isolated=True):
+    for solver in solvers:
+        yield run_isolated(solver) if isolated else execute(solver)
+
+
+def format_result(result):
+    answer = result.answer if result.error is None else f"ERROR {result.error}"
+    return f"{solver_name(result.solver)}: {answer}  " \
+           f"(wall {result.wall:.3f}s, cpu {result.cpu:.3f}s, rss {result.max_rss / 2**20:.1f} MiB" \
+           f"{', cached' if result.cached else ''})"
+
+
+### Unit tests ###
+
+class TestRunner(unittest.TestCase):
+    def test_execute(self):
+        solver = select(discover(), years="2021", days="1")[0]
+        result = execute(solver)
+        self.assertIsNone(result.error)
+        self.assertEqual(result.answer, 1466)
+        self.assertGreater(result.max_rss, 0)
+
+    def test_run_isolated(self):
+        solver = select(discover(), years="2024", days="1", parts="1")[0]
+        result = run_isolated(solver)
+        self.assertIsNone(result.error)
+        self.assertEqual(result.answer, 2756096)
+
+    def test_error(self):
+        result = execute(Solver(2024, 1, 1, os.path.join(ROOT, "missing.py"), SCRIPT))
+        self.assertIsNone(result.answer)
+        self.assertIn("missing.py", result.error)
+
+    def test_unknown_part(self):
+        for solver in select(discover(), years="2024", parts="1"):
+            result = execute(solver._replace(part=3))
+            self.assertIsNone(result.answer)
+            self.assertIn("no part 3", result.error)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "test":
+        # Run tests
+        unittest.main(argv=[sys.argv[0]])
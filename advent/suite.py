@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from collections import deque
+from multiprocessing.connection import wait
+
+from advent.registry import STATE_DIR, SCRIPT, Solver
+from advent.runner import Result, start_worker, receive_result
+
+# Run a whole selection of solvers on a pool of worker processes.
+# The slowest parts known from the previous runs start first, so the suite takes about as long
+# as its slowest part instead of the sum of all the parts.
+
+HISTORY_FILE = os.path.join(STATE_DIR, "timings.json")
+
+
+def history_key(solver):
+    return f"{solver.year}/{solver.day}/{solver.part}"
+
+
+def load_history(file_name=HISTORY_FILE):
+    try:
+        with open(file_name, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def update_history(results, file_name=HISTORY_FILE):
+    """
+    Record the wall time of the parts that succeeded.
+    """
+    history = load_history(file_name)
+    for result in results:
+        if result.error is None:
+            history[history_key(result.solver)] = result.wall
+    os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    with open(file_name, "w") as f:
+        json.dump(history, f, indent=2, sort_keys=True)
+    return history
+
+
+def schedule(solvers, history):
+    """
+    Sort the solvers longest first. Solvers never timed go first, they could be the slowest ones.
+    """
+    def priority(solver):
+        wall = history.get(history_key(solver))
+        return (wall is not None, -(wall or 0.0))
+    return sorted(solvers, key=priority)
+
+
+def run_suite(solvers, workers=None, timeout=None, memory_limit=None, history=None, func=None):
+    """
+    Run the solvers in parallel and yield their Results as soon as they finish.
+
+    Args:
+        workers: number of solvers running at the same time, the number of cores by default
+        timeout: seconds after which a solver is killed
+        memory_limit: address space limit of each solver, in bytes
+        history: wall time of the previous runs, used to start the slowest solvers first
+        func: function running a solver in its worker and returning its Result, execute by default
+    """
+    workers = workers or os.cpu_count() or 1
+    pending = deque(schedule(solvers, history or {}))
+    # connection -> (solver, process, deadline)
+    running = {}
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                solver = pending.popleft()
+                process, receiver = start_worker(solver, memory_limit, func)
+                deadline = time.monotonic() + timeout if timeout else None
+                running[receiver] = (solver, process, deadline)
+
+            deadlines = [deadline for (_, _, deadline) in running.values() if deadline is not None]
+            wait_time = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            for receiver in wait(list(running), timeout=wait_time):
+                (solver, process, _) = running.pop(receiver)
+                yield receive_result(solver, process, receiver)
+
+            now = time.monotonic()
+            for receiver, (solver, process, deadline) in list(running.items()):
+                if deadline is not None and now >= deadline:
+                    del running[receiver]
+                    process.kill()
+                    process.join()
+                    receiver.close()
+                    yield Result(solver, None, timeout, 0.0, 0, f"timed out after {timeout}s")
+    finally:
+        # the caller stopped early, do not leave orphan solvers behind
+        for (_, process, _) in running.values():
+            process.kill()
+            process.join()
+
+
+### Unit tests ###
+
+class TestSuite(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up test scripts for unit tests.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def script(self, day, code):
+        path = os.path.join(self.tmp_dir.name, f"d{day:02d}p1_test.py")
+        with open(path, "w") as f:
+            f.write(code)
+        return Solver(2000, day, 1, path, SCRIPT)
+
+    def test_schedule(self):
+        solvers = [Solver(2024, day, 1, "", SCRIPT) for day in (1, 2, 3)]
+        history = {"2024/1/1": 0.5, "2024/2/1": 3.0}
+        self.assertEqual([solver.day for solver in schedule(solvers, history)], [3, 2, 1])
+
+    def test_run_suite(self):
+        solvers = [self.script(1, "print(1)"),
+                   self.script(2, "import time\ntime.sleep(30)"),
+                   self.script(3, "x = bytearray(2**30)\nprint(len(x))")]
+        results = {result.solver.day: result for result in
+                   run_suite(solvers, workers=3, timeout=5, memory_limit=512 * 2**20)}
+        self.assertEqual(results[1].answer, "1")
+        self.assertIn("timed out", results[2].error)
+        self.assertIn("MemoryError", results[3].error)
+
+    def test_history(self):
+        file_name = os.path.join(self.tmp_dir.name, "timings.json")
+        solver = Solver(2024, 1, 1, "", SCRIPT)
+        update_history([Result(solver, 1, 2.5, 2.5, 0, None)], file_name)
+        self.assertEqual(load_history(file_name), {"2024/1/1": 2.5})
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "test":
+        # Run tests
+        unittest.main(argv=[sys.argv[0]])